@@ -32,13 +32,21 @@ and ERP implementation services.
         
         # Data
         'data/assessment_templates.xml',
+        'data/ir_cron.xml',
+        'data/project_blueprints.xml',
+        'data/recommendation_rules.xml',
+        'data/notification_templates.xml',
         
         # Views
         'views/client_views.xml',
         'views/assessment_views.xml',
         'views/project_views.xml',
+        'views/project_blueprint_views.xml',
         'views/consultant_views.xml',
         'views/dashboard_views.xml',
+        'views/perf_views.xml',
+        'views/bulk_operation_views.xml',
+        'views/portal_templates.xml',
         'views/menu_views.xml',
     ],
     'demo': [
@@ -0,0 +1,34 @@
+import argparse
+import sys
+
+import odoo
+from odoo import api, SUPERUSER_ID
+from odoo.cli import Command
+from odoo.modules.registry import Registry
+
+from ..models.export import EXPORT_DATASETS, EXPORT_FORMATS
+
+
+class DtExport(Command):
+    """Stream a Digital Transformation dataset to a CSV or columnar JSON Lines file"""
+    name = 'dt_export'
+
+    def run(self, cmdargs):
+        parser = argparse.ArgumentParser(prog=f'{sys.argv[0].split("/")[-1]} {self.name}', description=self.__doc__)
+        parser.add_argument('dataset', choices=sorted(EXPORT_DATASETS))
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv', dest='export_format')
+        parser.add_argument('--output', default='-', help="output file, '-' for stdout (default)")
+        parser.add_argument('--page-size', type=int, default=5000)
+        args, odoo_args = parser.parse_known_args(cmdargs)
+
+        odoo.tools.config.parse_config(odoo_args)
+        dbname = odoo.tools.config['db_name']
+        if not dbname:
+            parser.error("a database is required (-d DATABASE)")
+        with Registry(dbname).cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            if args.output == '-':
+                for chunk in env['dt.export'].stream(args.dataset, args.export_format, args.page_size):
+                    sys.stdout.write(chunk)
+            else:
+                env['dt.export']._export_to_file(args.dataset, args.output, args.export_format, args.page_size)
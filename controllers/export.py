@@ -0,0 +1,51 @@
+import logging
+
+from odoo import api, http
+from odoo.http import request
+
+from ..models.export import EXPORT_DATASETS
+
+_logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'columnar': ('application/x-ndjson', 'jsonl'),
+}
+
+
+class DataExportController(http.Controller):
+
+    @http.route('/dt/export/<string:dataset>', type='http', auth='user', methods=['GET'])
+    def export_dataset(self, dataset, format='csv', page_size=5000, **kwargs):
+        """Stream a dataset export page by page.
+
+        The response body is generated after the request's transaction has
+        ended, so the pages are read with a dedicated cursor that lives as long
+        as the download.
+        """
+        if dataset not in EXPORT_DATASETS or format not in CONTENT_TYPES:
+            return request.not_found()
+        try:
+            page_size = max(1, min(int(page_size), 50000))
+        except ValueError:
+            return request.make_response("page_size must be an integer", status=400,
+                                         headers=[('Content-Type', 'text/plain')])
+        content_type, extension = CONTENT_TYPES[format]
+        uid, context = request.env.uid, dict(request.env.context)
+        registry = request.env.registry
+
+        def generate():
+            with registry.cursor() as cr:
+                env = api.Environment(cr, uid, context)
+                try:
+                    for chunk in env['dt.export'].stream(dataset, format, page_size):
+                        yield chunk.encode()
+                except Exception:
+                    _logger.exception("Streaming export of %s failed", dataset)
+                    raise
+
+        return request.make_response(generate(), headers=[
+            ('Content-Type', content_type),
+            ('Content-Disposition', f'attachment; filename="{dataset}.{extension}"'),
+            ('Cache-Control', 'no-store'),
+        ])
@@ -0,0 +1,153 @@
+import hashlib
+import json
+
+from odoo import http
+from odoo.http import request
+from odoo.addons.portal.controllers.portal import CustomerPortal
+
+PROJECT_TEMPLATE = 'digital_transformation_accelerator.portal_my_dt_project'
+# projects of the clients whose partner belongs to the commercial partner of the user %(uid)s
+USER_PROJECTS = """
+      FROM dt_project project
+      JOIN dt_client_company client ON client.id = project.client_id
+      JOIN res_partner client_partner ON client_partner.id = client.partner_id
+      JOIN res_users portal_user ON portal_user.id = %(uid)s
+      JOIN res_partner user_partner ON user_partner.id = portal_user.partner_id
+     WHERE client_partner.commercial_partner_id = user_partner.commercial_partner_id
+"""
+PROJECT_FIELDS = ['name', 'state', 'progress', 'start_date', 'target_completion_date', 'actual_completion_date']
+PHASE_FIELDS = ['project_id', 'sequence', 'name', 'state', 'progress', 'start_date', 'end_date']
+MILESTONE_FIELDS = ['project_id', 'name', 'state', 'importance', 'target_date', 'actual_date', 'achieved']
+DELIVERABLE_FIELDS = ['project_id', 'name', 'state', 'due_date', 'delivery_date', 'delivered']
+
+
+class DigitalTransformationPortal(CustomerPortal):
+    """Client portal pages and JSON status of the transformation projects.
+
+    A portal user sees the projects of the clients whose partner belongs to
+    the user's commercial partner. Access and versions are resolved with one
+    SQL query, so a poll answered with 304 never loads a record; payloads are
+    built from one read per model with fixed field lists.
+    """
+
+    def _prepare_home_portal_values(self, counters):
+        values = super()._prepare_home_portal_values(counters)
+        if 'dt_project_count' in counters:
+            request.env.cr.execute(f"SELECT COUNT(*) {USER_PROJECTS}", {'uid': request.env.uid})
+            values['dt_project_count'] = request.env.cr.fetchone()[0]
+        return values
+
+    def _dt_project_versions(self, project_ids=None):
+        """Return {project_id: etag} of the user's projects, most recent first.
+
+        The etags also cover the language of the user and the last change of
+        the project page template, so a translated or updated page is not
+        answered with 304.
+        """
+        module, template = PROJECT_TEMPLATE.split('.')
+        request.env.cr.execute(f"""
+            SELECT project.id, project.write_date, project.progress,
+                   (SELECT MAX(write_date)::text || '/' || COUNT(*) || '/' || COALESCE(SUM(progress), 0)
+                      FROM dt_project_phase
+                     WHERE project_id = project.id),
+                   (SELECT MAX(write_date)::text || '/' || COUNT(*)
+                      FROM dt_project_milestone
+                     WHERE project_id = project.id),
+                   (SELECT MAX(write_date)::text || '/' || COUNT(*)
+                      FROM dt_project_deliverable
+                     WHERE project_id = project.id),
+                   (SELECT view.write_date
+                      FROM ir_model_data data
+                      JOIN ir_ui_view view ON view.id = data.res_id
+                     WHERE data.module = %(module)s AND data.name = %(template)s AND data.model = 'ir.ui.view')
+            {USER_PROJECTS}
+               AND (%(all)s OR project.id = ANY(%(ids)s))
+          ORDER BY project.start_date DESC NULLS LAST, project.id DESC
+        """, {
+            'uid': request.env.uid,
+            'all': project_ids is None,
+            'ids': list(project_ids or []),
+            'module': module,
+            'template': template,
+        })
+        lang = request.env.lang
+        return {
+            project_id: '"%s"' % hashlib.sha1(repr((lang, row)).encode()).hexdigest()
+            for project_id, *row in request.env.cr.fetchall()
+        }
+
+    def _dt_not_modified(self, etag):
+        """Return a 304 response when the client already holds ``etag``, else None"""
+        if request.httprequest.if_none_match.contains_weak(etag.strip('"')):
+            return request.make_response('', status=304, headers=[('ETag', etag)])
+        return None
+
+    def _dt_project_payloads(self, project_ids, with_details=False):
+        """Build the status of the projects with one read per model"""
+        env = request.env
+        projects = env['dt.project'].sudo().browse(project_ids).read(PROJECT_FIELDS, load=None)
+        payloads = {project['id']: dict(project, phases=[], milestones=[], deliverables=[]) for project in projects}
+        if with_details:
+            for model_name, field_names, key, order in (
+                    ('dt.project.phase', PHASE_FIELDS, 'phases', 'sequence, id'),
+                    ('dt.project.milestone', MILESTONE_FIELDS, 'milestones', 'target_date, id'),
+                    ('dt.project.deliverable', DELIVERABLE_FIELDS, 'deliverables', 'due_date, id')):
+                for row in env[model_name].sudo().search_read(
+                        [('project_id', 'in', project_ids)], field_names, order=order, load=None):
+                    payloads[row.pop('project_id')][key].append(row)
+        return [payloads[project_id] for project_id in project_ids if project_id in payloads]
+
+    def _dt_labels(self):
+        env = request.env
+        return {
+            'project_state': dict(env['dt.project']._fields['state'].selection),
+            'phase_state': dict(env['dt.project.phase']._fields['state'].selection),
+            'milestone_state': dict(env['dt.project.milestone']._fields['state'].selection),
+            'deliverable_state': dict(env['dt.project.deliverable']._fields['state'].selection),
+            'importance': dict(env['dt.project.milestone']._fields['importance'].selection),
+        }
+
+    @http.route(['/my/dt/projects'], type='http', auth='user', methods=['GET'])
+    def portal_my_dt_projects(self, **kwargs):
+        project_ids = list(self._dt_project_versions())
+        values = self._prepare_portal_layout_values()
+        values.update({
+            'page_name': 'dt_projects',
+            'projects': self._dt_project_payloads(project_ids),
+            'labels': self._dt_labels(),
+        })
+        return request.render('digital_transformation_accelerator.portal_my_dt_projects', values)
+
+    @http.route(['/my/dt/projects/<int:project_id>'], type='http', auth='user', methods=['GET'])
+    def portal_my_dt_project(self, project_id, **kwargs):
+        etag = self._dt_project_versions([project_id]).get(project_id)
+        if not etag:
+            return request.not_found()
+        not_modified = self._dt_not_modified(etag)
+        if not_modified:
+            return not_modified
+        values = self._prepare_portal_layout_values()
+        values.update({
+            'page_name': 'dt_project',
+            'project': self._dt_project_payloads([project_id], with_details=True)[0],
+            'labels': self._dt_labels(),
+        })
+        response = request.render(PROJECT_TEMPLATE, values)
+        response.headers['ETag'] = etag
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    @http.route(['/my/dt/projects/<int:project_id>/status'], type='http', auth='user', methods=['GET'])
+    def portal_my_dt_project_status(self, project_id, **kwargs):
+        etag = self._dt_project_versions([project_id]).get(project_id)
+        if not etag:
+            return request.not_found()
+        not_modified = self._dt_not_modified(etag)
+        if not_modified:
+            return not_modified
+        payload = self._dt_project_payloads([project_id], with_details=True)[0]
+        return request.make_response(json.dumps(payload, default=str, separators=(',', ':')), headers=[
+            ('Content-Type', 'application/json'),
+            ('ETag', etag),
+            ('Cache-Control', 'private, no-cache'),
+        ])
@@ -1,4 +1,17 @@
+from . import bulk_operation
 from . import client_company
 from . import assessment
 from . import transformation_project
 from . import consultant
+from . import portfolio_dashboard
+from . import perf_sample
+from . import query_plan
+from . import benchmark
+from . import assessment_import
+from . import export
+from . import project_blueprint
+from . import consultant_load
+from . import recommendation_rule
+from . import maturity_snapshot
+from . import maturity_benchmark
+from . import notification_event
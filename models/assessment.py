@@ -1,18 +1,32 @@
-from odoo import models, fields, api
-from odoo.exceptions import ValidationError
+import logging
+from collections import defaultdict
+
+import psycopg2
+
+from odoo import models, fields, api, tools
+from odoo.exceptions import MissingError, UserError, ValidationError
+from odoo.tools.sql import column_exists, create_index
+
+from .perf_sample import instrumented
+
+_logger = logging.getLogger(__name__)
+
+CATEGORIES = ('technology', 'process', 'people', 'culture')
+QUESTIONNAIRE_DIRTY_KEY = 'dt.assessment.questionnaire'
 
 
 class Assessment(models.Model):
     """Digital Maturity Assessment Model"""
     _name = 'dt.assessment'
     _description = 'Digital Transformation Assessment'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'dt.bulk.mixin']
     _order = 'assessment_date desc'
 
     name = fields.Char(string='Assessment Name', required=True, tracking=True)
     client_id = fields.Many2one('dt.client.company', string='Client', required=True, tracking=True)
     consultant_id = fields.Many2one('dt.consultant', string='Lead Consultant', required=True)
-    assessment_date = fields.Date(string='Assessment Date', default=fields.Date.context_today, required=True)
+    assessment_date = fields.Date(string='Assessment Date', default=fields.Date.context_today, required=True,
+                                  index=True)
     completion_date = fields.Date(string='Completion Date')
     
     state = fields.Selection([
@@ -21,7 +35,7 @@ class Assessment(models.Model):
         ('review', 'Under Review'),
         ('completed', 'Completed'),
         ('cancelled', 'Cancelled'),
-    ], string='Status', default='draft', tracking=True)
+    ], string='Status', default='draft', tracking=True, index=True)
     
     # Assessment Categories
     technology_score = fields.Float(string='Technology Score', compute='_compute_category_scores', store=True,
@@ -34,85 +48,289 @@ class Assessment(models.Model):
                                  help="Digital culture and change readiness score")
     
     total_score = fields.Float(string='Total Score', compute='_compute_total_score', store=True)
+
+    # Running per-category aggregates, maintained by dt.assessment.line deltas
+    technology_score_sum = fields.Float(string='Technology Score Sum', readonly=True, copy=False)
+    technology_line_count = fields.Integer(string='Technology Questions', readonly=True, copy=False)
+    process_score_sum = fields.Float(string='Process Score Sum', readonly=True, copy=False)
+    process_line_count = fields.Integer(string='Process Questions', readonly=True, copy=False)
+    people_score_sum = fields.Float(string='People Score Sum', readonly=True, copy=False)
+    people_line_count = fields.Integer(string='People Questions', readonly=True, copy=False)
+    culture_score_sum = fields.Float(string='Culture Score Sum', readonly=True, copy=False)
+    culture_line_count = fields.Integer(string='Culture Questions', readonly=True, copy=False)
+    answered_line_count = fields.Integer(string='Answered Questions', readonly=True, copy=False)
     
     # Detailed Assessment
+    questionnaire_id = fields.Many2one('dt.assessment.questionnaire', string='Questionnaire Version',
+                                       readonly=True, copy=False, ondelete='restrict')
+    import_ref = fields.Char(string='Import Reference', readonly=True, copy=False, index=True,
+                             help="Key of the historical assessment this record was imported from")
     assessment_line_ids = fields.One2many('dt.assessment.line', 'assessment_id', string='Assessment Questions')
     
     # Recommendations
     recommendations = fields.Html(string='Recommendations')
+    recommendation_revision = fields.Char(string='Recommendation Rules Revision', readonly=True, copy=False,
+                                          index=True)
     priority_areas = fields.Text(string='Priority Areas')
     estimated_timeline = fields.Char(string='Estimated Timeline')
     estimated_budget = fields.Float(string='Estimated Budget')
     
     # Progress Tracking
     progress = fields.Float(string='Assessment Progress', compute='_compute_progress')
+
+    _sql_constraints = [
+        ('import_ref_unique', 'unique(import_ref)', 'An assessment was already imported with this reference.'),
+    ]
     
-    @api.depends('technology_score', 'process_score', 'people_score', 'culture_score')
+    @api.depends('technology_score_sum', 'technology_line_count', 'process_score_sum', 'process_line_count',
+                 'people_score_sum', 'people_line_count', 'culture_score_sum', 'culture_line_count')
+    @instrumented
     def _compute_total_score(self):
         for record in self:
-            scores = [record.technology_score, record.process_score, record.people_score, record.culture_score]
+            scores = [record._category_average(category) for category in CATEGORIES]
             valid_scores = [s for s in scores if s > 0]
             record.total_score = sum(valid_scores) / len(valid_scores) if valid_scores else 0.0
 
-    @api.depends('assessment_line_ids', 'assessment_line_ids.answer')
+    @api.depends('technology_line_count', 'process_line_count', 'people_line_count', 'culture_line_count',
+                 'answered_line_count')
+    @instrumented
     def _compute_progress(self):
         for record in self:
-            total_questions = len(record.assessment_line_ids)
-            answered_questions = len(record.assessment_line_ids.filtered('answer'))
+            total_questions = sum(record[f'{category}_line_count'] for category in CATEGORIES)
+            answered_questions = record.answered_line_count
             record.progress = (answered_questions / total_questions * 100) if total_questions else 0
 
-    @api.depends('assessment_line_ids', 'assessment_line_ids.score', 'assessment_line_ids.category')
+    @api.depends('technology_score_sum', 'technology_line_count', 'process_score_sum', 'process_line_count',
+                 'people_score_sum', 'people_line_count', 'culture_score_sum', 'culture_line_count')
+    @instrumented
     def _compute_category_scores(self):
         for record in self:
-            tech_scores = [l.score for l in record.assessment_line_ids if l.category == 'technology']
-            proc_scores = [l.score for l in record.assessment_line_ids if l.category == 'process']
-            people_scores = [l.score for l in record.assessment_line_ids if l.category == 'people']
-            culture_scores = [l.score for l in record.assessment_line_ids if l.category == 'culture']
+            record.technology_score = record._category_average('technology')
+            record.process_score = record._category_average('process')
+            record.people_score = record._category_average('people')
+            record.culture_score = record._category_average('culture')
+
+    def init(self):
+        # latest assessment per client (DISTINCT ON in dt.client.company) and the client's assessment list
+        create_index(self.env.cr, 'dt_assessment_client_date_idx', self._table,
+                     ['client_id', 'assessment_date DESC', 'id DESC'])
+
+    def write(self, vals):
+        if 'state' not in vals:
+            return super().write(vals)
+        old_states = {assessment.id: assessment.state for assessment in self}
+        res = super().write(vals)
+        self.env['dt.notification.event']._queue(self, 'state', old_states)
+        return res
+
+    def _category_average(self, category):
+        """Average line score of a category on a 0-100 scale, read from the running aggregates"""
+        count = self[f'{category}_line_count']
+        return self[f'{category}_score_sum'] / count * 10 if count else 0.0
+
+    def _apply_line_deltas(self, deltas):
+        """Apply aggregate deltas collected from dt.assessment.line changes.
+
+        ``deltas`` maps ``(assessment_id, category)`` to ``[score, count, answered]``
+        increments. Each assessment gets a single in-cache write, so the dependent
+        scores are recomputed once at flush time whatever the number of lines.
+        """
+        for assessment in self.sudo():
+            vals = {}
+            answered = 0
+            for category in CATEGORIES:
+                delta = deltas.get((assessment.id, category))
+                if not delta:
+                    continue
+                score, count, answered_count = delta
+                vals[f'{category}_score_sum'] = assessment[f'{category}_score_sum'] + score
+                vals[f'{category}_line_count'] = assessment[f'{category}_line_count'] + count
+                answered += answered_count
+            if answered:
+                vals['answered_line_count'] = assessment.answered_line_count + answered
+            if vals:
+                assessment.write(vals)
+
+    def _rebuild_line_aggregates(self):
+        """Rebuild the running aggregates from dt.assessment.line in one statement.
+
+        Applies to ``self``, or to every assessment when called on an empty recordset.
+        """
+        self.env['dt.assessment.line'].flush_model()
+        self.flush_model()
+        columns = []
+        selects = []
+        for category in CATEGORIES:
+            columns += [f'{category}_score_sum', f'{category}_line_count']
+            selects += [
+                f"COALESCE(SUM(l.score) FILTER (WHERE l.category = '{category}'), 0)",
+                f"COUNT(l.id) FILTER (WHERE l.category = '{category}')",
+            ]
+        columns.append('answered_line_count')
+        selects.append("COUNT(l.id) FILTER (WHERE l.answer IS NOT NULL)")
+        where = "WHERE a.id = ANY(%(ids)s)" if self else ""
+        self.env.cr.execute(f"""
+            UPDATE dt_assessment AS a
+               SET {', '.join(f'{column} = agg.{column}' for column in columns)}
+              FROM (
+                    SELECT a.id, {', '.join(f'{select} AS {column}' for select, column in zip(selects, columns))}
+                      FROM dt_assessment AS a
+                 LEFT JOIN dt_assessment_line AS l ON l.assessment_id = a.id
+                     {where}
+                  GROUP BY a.id
+                   ) AS agg
+             WHERE agg.id = a.id
+        """, {'ids': self.ids})
+        self.invalidate_model(columns)
+
+    @instrumented
+    def submit_answers(self, answers):
+        """Apply a full answer vector to the questionnaire in one round trip.
 
-            record.technology_score = (sum(tech_scores) / len(tech_scores))*10 if tech_scores else 0.0
-            record.process_score = sum(proc_scores) / len(proc_scores)*10 if proc_scores else 0.0
-            record.people_score = sum(people_scores) / len(people_scores)*10 if people_scores else 0.0
-            record.culture_score = sum(culture_scores) / len(culture_scores)*10 if culture_scores else 0.0
+        ``answers`` maps line ids to an answer value ('1'..'5', or False to
+        clear it) or to a dict with ``answer`` and/or ``notes`` keys. The vector
+        is validated as a whole, then written with one UPDATE per distinct
+        answer value and one for the notes; the aggregates are rebuilt with one
+        statement, so the scores of the assessment and the maturity of its
+        client are recomputed exactly once. Returns the resulting progress and
+        scores.
+        """
+        self.ensure_one()
+        self.check_access('write')
+        if self.state not in ('draft', 'in_progress'):
+            raise UserError("Answers can only be submitted on draft or in progress assessments.")
+        Line = self.env['dt.assessment.line']
+        valid_answers = {key for key, _label in Line._fields['answer'].selection}
+        by_answer = defaultdict(list)
+        notes = {}
+        for line_id, value in answers.items():
+            try:
+                line_id = int(line_id)
+            except (TypeError, ValueError):
+                raise ValidationError(f"Invalid question line id {line_id!r}.") from None
+            if not isinstance(value, dict):
+                value = {'answer': value}
+            if 'answer' in value:
+                answer = value['answer'] and str(value['answer'])
+                if answer and answer not in valid_answers:
+                    raise ValidationError(f"Invalid answer {answer!r} for question line {line_id}.")
+                by_answer[answer or None].append(line_id)
+            if 'notes' in value:
+                notes[line_id] = value['notes'] or None
+        line_ids = {line_id for ids in by_answer.values() for line_id in ids} | set(notes)
+        lines = Line.search([('id', 'in', list(line_ids)), ('assessment_id', '=', self.id)])
+        if len(lines) != len(line_ids):
+            unknown = sorted(line_ids - set(lines.ids))
+            raise ValidationError(f"Question lines {unknown} do not belong to assessment {self.name}.")
+        lines.check_access('write')
 
+        Line.flush_model()
+        cr = self.env.cr
+        for answer, ids in by_answer.items():
+            cr.execute("""
+                UPDATE dt_assessment_line
+                   SET answer = %(answer)s,
+                       score = COALESCE(%(answer)s::float8 * weight, 0),
+                       write_uid = %(uid)s,
+                       write_date = NOW() AT TIME ZONE 'UTC'
+                 WHERE id = ANY(%(ids)s)
+            """, {'answer': answer, 'uid': self.env.uid, 'ids': ids})
+        if notes:
+            cr.execute("""
+                UPDATE dt_assessment_line AS l
+                   SET notes = v.notes,
+                       write_uid = %s,
+                       write_date = NOW() AT TIME ZONE 'UTC'
+                  FROM unnest(%s::int[], %s::text[]) AS v(id, notes)
+                 WHERE l.id = v.id
+            """, [self.env.uid, list(notes), list(notes.values())])
+        lines.invalidate_recordset(['answer', 'score', 'notes', 'write_uid', 'write_date'])
+
+        self._rebuild_line_aggregates()
+        self.modified([f'{category}_{aggregate}' for category in CATEGORIES
+                       for aggregate in ('score_sum', 'line_count')] + ['answered_line_count'])
+        return {
+            'updated': len(lines),
+            'progress': self.progress,
+            'total_score': self.total_score,
+            'category_scores': {category: self[f'{category}_score'] for category in CATEGORIES},
+        }
+
+    @instrumented
     def action_start_assessment(self):
-        self.state = 'in_progress'
+        self._bulk_write({'state': 'in_progress'}, "Started")
         self._generate_assessment_questions()
     
+    @instrumented
     def action_submit_review(self):
-        if self.progress < 100:
+        if any(assessment.progress < 100 for assessment in self):
             raise ValidationError("Please complete all assessment questions before submitting.")
-        self.state = 'review'
+        self._bulk_write({'state': 'review'}, "Submitted for review")
     
+    @instrumented
     def action_complete(self):
-        self.state = 'completed'
-        self.completion_date = fields.Date.context_today(self)
+        self._bulk_write({'state': 'completed', 'completion_date': fields.Date.context_today(self)}, "Completed")
         self._generate_recommendations()
+        self._snapshot_completed()
     
+    def _snapshot_completed(self):
+        """Append the maturity snapshots of the completed assessments and refresh their peer groups"""
+        completed = self.filtered(lambda assessment: assessment.state == 'completed')
+        if not completed:
+            return
+        self.env['dt.maturity.snapshot']._append(completed.ids)
+        self.env['dt.maturity.benchmark']._mark_dirty(
+            {(assessment.client_id.industry_type, assessment.client_id.company_size) for assessment in completed})
+
     def _generate_assessment_questions(self):
-        """Generate assessment questions based on templates"""
-        template_questions = self.env['dt.assessment.template'].search([('active', '=', True)])
-        for question in template_questions:
-            self.env['dt.assessment.line'].create({
-                'assessment_id': self.id,
-                'question_id': question.id,
-                'category': question.category,
-                'question_text': question.question_text,
-                'weight': question.weight,
-            })
+        """Generate the questions of every assessment in self from the active questionnaire version"""
+        questionnaire_id, questions = self.env['dt.assessment.questionnaire']._get_active_snapshot()
+        self.write({'questionnaire_id': questionnaire_id})
+        # A single batched create: scores and aggregates are recomputed once at flush
+        return self.env['dt.assessment.line'].create([{
+            'assessment_id': assessment.id,
+            'version_question_id': question_id,
+            'question_id': template_id,
+            'category': category,
+            'weight': weight,
+        } for assessment in self for question_id, template_id, category, weight in questions])
     
     def _generate_recommendations(self):
-        """Generate recommendations based on scores"""
-        recommendations = []
-        if self.technology_score < 50:
-            recommendations.append("• Urgent technology infrastructure upgrade needed")
-        if self.process_score < 50:
-            recommendations.append("• Business process optimization required")
-        if self.people_score < 50:
-            recommendations.append("• Skills development and training programs essential")
-        if self.culture_score < 50:
-            recommendations.append("• Change management and culture transformation needed")
-        
-        self.recommendations = '<br/>'.join(recommendations)
+        """Generate the recommendations of every assessment in self from the recommendation rules.
+
+        Rules are evaluated against the compiled, cached rule set; each
+        assessment gets a single write, skipped when nothing changed.
+        """
+        Rule = self.env['dt.recommendation.rule']
+        compiled = Rule._get_compiled_rules()
+        revision = Rule._get_rules_revision()
+        for assessment in self:
+            scores = {category: assessment[f'{category}_score'] for category in CATEGORIES}
+            scores['total'] = assessment.total_score
+            recommendations = Rule._recommend(compiled, assessment.client_id.industry_type, scores)
+            vals = {'recommendation_revision': revision}
+            if recommendations != (assessment.recommendations or ''):
+                vals['recommendations'] = recommendations
+            assessment.write(vals)
+
+    @api.model
+    def _cron_regenerate_recommendations(self, batch_size=1000):
+        """Regenerate the recommendations of completed assessments made with an older rule set, batch by batch.
+
+        The outdated assessments are listed once at the start, so the run ends
+        even when a rule changes meanwhile; the next run picks up the rest.
+        """
+        revision = self.env['dt.recommendation.rule']._get_rules_revision()
+        outdated_ids = self.search([
+            ('state', '=', 'completed'),
+            ('recommendation_revision', '!=', revision),
+        ], order='id').ids
+        for ids in tools.split_every(batch_size, outdated_ids):
+            assessments = self.browse(ids).exists()
+            assessments.with_context(tracking_disable=True)._generate_recommendations()
+            self.env.cr.commit()
+            self.env.invalidate_all()
+            _logger.info("Regenerated the recommendations of %d assessments", len(assessments))
 
 
 class AssessmentLine(models.Model):
@@ -122,6 +340,8 @@ class AssessmentLine(models.Model):
     
     assessment_id = fields.Many2one('dt.assessment', string='Assessment', required=True, ondelete='cascade')
     question_id = fields.Many2one('dt.assessment.template', string='Question Template')
+    version_question_id = fields.Many2one('dt.assessment.questionnaire.question', string='Versioned Question',
+                                          ondelete='restrict', index=True)
     category = fields.Selection([
         ('technology', 'Technology'),
         ('process', 'Process'),
@@ -129,7 +349,7 @@ class AssessmentLine(models.Model):
         ('culture', 'Culture'),
     ], string='Category', required=True)
     
-    question_text = fields.Text(string='Question', required=True)
+    question_text = fields.Text(string='Question', related='version_question_id.question_text')
     weight = fields.Float(string='Weight', default=1.0)
     answer = fields.Selection([
         ('1', 'Strongly Disagree (1)'),
@@ -142,10 +362,66 @@ class AssessmentLine(models.Model):
     notes = fields.Text(string='Notes')
     
     @api.depends('answer', 'weight')
+    @instrumented
     def _compute_score(self):
         for record in self:
             record.score = (float(record.answer) * record.weight) if record.answer else 0.0
 
+    def init(self):
+        # one2many fetch of the questionnaire and per-category scoring
+        create_index(self.env.cr, 'dt_assessment_line_assessment_category_idx', self._table,
+                     ['assessment_id', 'category'])
+        # Fill the running aggregates of assessments created before they existed
+        self.env.cr.execute("""
+            SELECT 1
+              FROM dt_assessment AS a
+             WHERE COALESCE(a.technology_line_count, 0) + COALESCE(a.process_line_count, 0)
+                 + COALESCE(a.people_line_count, 0) + COALESCE(a.culture_line_count, 0) = 0
+               AND EXISTS (SELECT 1 FROM dt_assessment_line AS l WHERE l.assessment_id = a.id)
+             LIMIT 1
+        """)
+        if self.env.cr.fetchone():
+            self.env['dt.assessment']._rebuild_line_aggregates()
+
+    def _aggregate_contributions(self):
+        """Return the contribution of these lines to the assessment aggregates"""
+        contributions = defaultdict(lambda: [0.0, 0, 0])
+        for line in self:
+            contribution = contributions[(line.assessment_id.id, line.category)]
+            contribution[0] += line.score
+            contribution[1] += 1
+            contribution[2] += 1 if line.answer else 0
+        return contributions
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        lines.assessment_id._apply_line_deltas(lines._aggregate_contributions())
+        return lines
+
+    def write(self, vals):
+        if not {'assessment_id', 'category', 'answer', 'weight'} & set(vals):
+            return super().write(vals)
+        before = self._aggregate_contributions()
+        assessments = self.assessment_id
+        res = super().write(vals)
+        deltas = self._aggregate_contributions()
+        for key, contribution in before.items():
+            delta = deltas[key]
+            for i, value in enumerate(contribution):
+                delta[i] -= value
+        (assessments | self.assessment_id)._apply_line_deltas(deltas)
+        return res
+
+    def unlink(self):
+        deltas = self._aggregate_contributions()
+        for contribution in deltas.values():
+            contribution[:] = [-value for value in contribution]
+        assessments = self.assessment_id
+        res = super().unlink()
+        assessments.exists()._apply_line_deltas(deltas)
+        return res
+
 
 class AssessmentTemplate(models.Model):
     """Assessment Question Template"""
@@ -163,3 +439,205 @@ class AssessmentTemplate(models.Model):
     weight = fields.Float(string='Weight', default=1.0)
     active = fields.Boolean(string='Active', default=True)
     sequence = fields.Integer(string='Sequence', default=10)
+
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        templates = super().create(vals_list)
+        self._questionnaire_changed()
+        return templates
+
+    def write(self, vals):
+        res = super().write(vals)
+        self._questionnaire_changed()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self._questionnaire_changed()
+        return res
+
+    def _questionnaire_changed(self):
+        """Mark the questionnaire as changed by the current transaction"""
+        self.env.cr.precommit.data[QUESTIONNAIRE_DIRTY_KEY] = True
+
+    @api.model
+    def _get_questionnaire_fingerprint(self):
+        """Return the fingerprint of the templates (count and latest write date), moved by any change"""
+        self.flush_model()
+        self.env.cr.execute("SELECT COUNT(*), MAX(write_date) FROM dt_assessment_template")
+        count, last_write = self.env.cr.fetchone()
+        return f"{count}/{last_write and last_write.isoformat()}"
+
+
+class Questionnaire(models.Model):
+    """Immutable snapshot of the active question templates"""
+    _name = 'dt.assessment.questionnaire'
+    _description = 'Assessment Questionnaire Version'
+    _order = 'revision desc'
+
+    name = fields.Char(string='Version', required=True)
+    revision = fields.Integer(string='Template Revision', required=True, readonly=True)
+    template_fingerprint = fields.Char(string='Template Fingerprint', readonly=True, copy=False)
+    question_ids = fields.One2many('dt.assessment.questionnaire.question', 'questionnaire_id', string='Questions',
+                                   readonly=True)
+    question_count = fields.Integer(string='Questions', compute='_compute_question_count')
+
+    _sql_constraints = [
+        ('revision_unique', 'unique(revision)', 'A questionnaire version already exists for this template revision.'),
+        ('template_fingerprint_unique', 'unique(template_fingerprint)',
+         'A questionnaire version already exists for these templates.'),
+    ]
+
+    @api.depends('question_ids')
+    def _compute_question_count(self):
+        counts = {
+            questionnaire.id: count
+            for questionnaire, count in self.env['dt.assessment.questionnaire.question']._read_group(
+                [('questionnaire_id', 'in', self.ids)], ['questionnaire_id'], ['__count'])
+        }
+        for record in self:
+            record.question_count = counts.get(record.id, 0)
+
+    def write(self, vals):
+        if set(vals) - {'name'}:
+            raise UserError("Questionnaire versions are immutable; edit the question templates instead.")
+        return super().write(vals)
+
+    @api.model
+    def _get_active_snapshot(self):
+        """Return ``(questionnaire_id, ((question_id, template_id, category, weight), ...))``.
+
+        The version is frozen on the first assessment start after a template
+        change. Committed versions are served from the ormcache keyed on the
+        template fingerprint; a transaction that changed the templates or
+        froze a version reads it without caching, so that a version rolled
+        back with its transaction never lands in the shared cache.
+        """
+        fingerprint = self.env['dt.assessment.template']._get_questionnaire_fingerprint()
+        try:
+            if self.env.cr.precommit.data.get(QUESTIONNAIRE_DIRTY_KEY):
+                return self._read_snapshot(fingerprint)
+            return self._snapshot_for_fingerprint(fingerprint)
+        except MissingError:
+            self._freeze(fingerprint)
+            return self._read_snapshot(fingerprint)
+
+    @tools.ormcache('fingerprint')
+    def _snapshot_for_fingerprint(self, fingerprint):
+        # a missing version raises instead of returning, so that the miss is not cached
+        return self._read_snapshot(fingerprint)
+
+    @api.model
+    def _read_snapshot(self, fingerprint):
+        questionnaire = self.sudo().search([('template_fingerprint', '=', fingerprint)], limit=1)
+        if not questionnaire:
+            raise MissingError(f"No questionnaire version for the template fingerprint {fingerprint}.")
+        return questionnaire.id, tuple(
+            (question.id, question.template_id.id, question.category, question.weight)
+            for question in questionnaire.question_ids
+        )
+
+    @api.model
+    def _freeze(self, fingerprint):
+        """Snapshot the active templates as the questionnaire version of ``fingerprint``"""
+        self.env.cr.precommit.data[QUESTIONNAIRE_DIRTY_KEY] = True
+        templates = self.env['dt.assessment.template'].sudo().search([('active', '=', True)])
+        self.env.cr.execute("SELECT COALESCE(MAX(revision), 0) + 1 FROM dt_assessment_questionnaire")
+        revision = self.env.cr.fetchone()[0]
+        try:
+            with self.env.cr.savepoint():
+                self.sudo().create({
+                    'name': f"Revision {revision}",
+                    'revision': revision,
+                    'template_fingerprint': fingerprint,
+                    'question_ids': [(0, 0, {
+                        'template_id': template.id,
+                        'name': template.name,
+                        'category': template.category,
+                        'question_text': template.question_text,
+                        'weight': template.weight,
+                        'sequence': template.sequence,
+                    }) for template in templates],
+                })
+        except psycopg2.errors.UniqueViolation as e:
+            # frozen concurrently by another transaction starting an assessment; its version is not
+            # visible to this transaction, so let the request be retried in a new one
+            raise psycopg2.errors.SerializationFailure(
+                f"Questionnaire version {revision} frozen concurrently") from e
+
+
+class QuestionnaireQuestion(models.Model):
+    """Question of an immutable questionnaire version"""
+    _name = 'dt.assessment.questionnaire.question'
+    _description = 'Assessment Questionnaire Question'
+    _order = 'questionnaire_id, category, sequence, id'
+
+    questionnaire_id = fields.Many2one('dt.assessment.questionnaire', string='Questionnaire Version',
+                                       required=True, ondelete='cascade', index=True)
+    template_id = fields.Many2one('dt.assessment.template', string='Question Template', ondelete='set null')
+    name = fields.Char(string='Question Name', required=True)
+    category = fields.Selection([
+        ('technology', 'Technology'),
+        ('process', 'Process'),
+        ('people', 'People & Skills'),
+        ('culture', 'Culture'),
+    ], string='Category', required=True)
+    question_text = fields.Text(string='Question Text', required=True)
+    weight = fields.Float(string='Weight', default=1.0)
+    sequence = fields.Integer(string='Sequence', default=10)
+
+    def init(self):
+        # Lines created before versioning carry their own copy of the question text:
+        # move each distinct question into a legacy version and point the lines at it.
+        # The column is dropped once migrated, so that the line table only keeps the reference.
+        cr = self.env.cr
+        if not column_exists(cr, 'dt_assessment_line', 'question_text'):
+            return
+        cr.execute("SELECT 1 FROM dt_assessment_line WHERE version_question_id IS NULL LIMIT 1")
+        if cr.fetchone():
+            self._migrate_legacy_lines()
+        cr.execute("ALTER TABLE dt_assessment_line DROP COLUMN question_text")
+
+    def _migrate_legacy_lines(self):
+        cr = self.env.cr
+        cr.execute("""
+            INSERT INTO dt_assessment_questionnaire (name, revision, create_date, write_date)
+                 VALUES ('Legacy questions', -1, now() at time zone 'UTC', now() at time zone 'UTC')
+            ON CONFLICT (revision) DO UPDATE SET name = EXCLUDED.name
+              RETURNING id
+        """)
+        legacy_id = cr.fetchone()[0]
+        cr.execute("""
+            INSERT INTO dt_assessment_questionnaire_question
+                        (questionnaire_id, template_id, name, category, question_text, weight, sequence,
+                         create_date, write_date)
+                 SELECT DISTINCT ON (l.question_id, l.category, l.question_text, l.weight)
+                        %(legacy_id)s, l.question_id, COALESCE(t.name, LEFT(l.question_text, 80)),
+                        l.category, l.question_text, l.weight, COALESCE(t.sequence, 10),
+                        now() at time zone 'UTC', now() at time zone 'UTC'
+                   FROM dt_assessment_line AS l
+              LEFT JOIN dt_assessment_template AS t ON t.id = l.question_id
+                  WHERE l.version_question_id IS NULL AND l.question_text IS NOT NULL
+               ORDER BY l.question_id, l.category, l.question_text, l.weight
+        """, {'legacy_id': legacy_id})
+        cr.execute("""
+            UPDATE dt_assessment_line AS l
+               SET version_question_id = q.id
+              FROM dt_assessment_questionnaire_question AS q
+             WHERE q.questionnaire_id = %(legacy_id)s
+               AND l.version_question_id IS NULL
+               AND q.template_id IS NOT DISTINCT FROM l.question_id
+               AND q.category = l.category
+               AND q.question_text = l.question_text
+               AND q.weight IS NOT DISTINCT FROM l.weight
+        """, {'legacy_id': legacy_id})
+        cr.execute("""
+            UPDATE dt_assessment AS a
+               SET questionnaire_id = %(legacy_id)s
+             WHERE a.questionnaire_id IS NULL
+               AND EXISTS (SELECT 1 FROM dt_assessment_line AS l WHERE l.assessment_id = a.id)
+        """, {'legacy_id': legacy_id})
+
+    def write(self, vals):
+        raise UserError("Questions of a questionnaire version are immutable; edit the question templates instead.")
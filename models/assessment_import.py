@@ -0,0 +1,197 @@
+import csv
+import json
+import logging
+import time
+from itertools import islice
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError, ValidationError
+
+_logger = logging.getLogger(__name__)
+
+ANSWERS = {'1', '2', '3', '4', '5'}
+
+
+class AssessmentImportJob(models.Model):
+    """Streaming, resumable import of historical assessments and answers.
+
+    The source file holds one answer per row (CSV with a header line, or JSON
+    Lines) with the keys ``assessment_ref``, ``client_id``, ``consultant_id``,
+    ``assessment_date``, ``question_id`` (a dt.assessment.template id),
+    ``answer`` and ``notes``, plus the optional ``assessment_name`` and
+    ``state``. Rows are read in chunks of ``chunk_size``; each chunk is
+    inserted with batched creates and committed together with the checkpoint,
+    so an interrupted job resumes at the first row of the chunk that failed.
+    """
+    _name = 'dt.assessment.import.job'
+    _description = 'Historical Assessment Import'
+    _order = 'id desc'
+
+    name = fields.Char(string='Name', required=True)
+    file_path = fields.Char(string='Server File Path', required=True,
+                            help="Path of the CSV or JSON Lines file on the server")
+    file_format = fields.Selection([
+        ('csv', 'CSV'),
+        ('jsonl', 'JSON Lines'),
+    ], string='Format', required=True, default='csv')
+    chunk_size = fields.Integer(string='Chunk Size', default=5000, required=True)
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='draft', required=True)
+    rows_done = fields.Integer(string='Rows Imported', readonly=True, copy=False,
+                               help="Checkpoint: number of source rows already committed")
+    assessments_created = fields.Integer(string='Assessments Created', readonly=True, copy=False)
+    rows_per_second = fields.Float(string='Rows / Second', readonly=True, copy=False, digits=(16, 1))
+    last_error = fields.Text(string='Last Error', readonly=True, copy=False)
+
+    @api.constrains('chunk_size')
+    def _check_chunk_size(self):
+        for record in self:
+            if record.chunk_size <= 0:
+                raise ValidationError("The chunk size must be positive.")
+
+    # ---------------------------
+    # ACTIONS
+    # ---------------------------
+    def action_queue(self):
+        """Queue the jobs for the import cron, resuming from their checkpoint"""
+        self.write({'state': 'queued', 'last_error': False})
+        self.env.ref('digital_transformation_accelerator.ir_cron_run_assessment_imports')._trigger()
+
+    def action_reset(self):
+        """Forget the checkpoint so that the next run starts from the first row"""
+        if 'running' in self.mapped('state'):
+            raise UserError("A running import cannot be reset.")
+        self.write({'state': 'draft', 'rows_done': 0, 'assessments_created': 0,
+                    'rows_per_second': 0.0, 'last_error': False})
+
+    @api.model
+    def _cron_run_imports(self):
+        for job in self.search([('state', 'in', ('queued', 'running'))]):
+            job._run(auto_commit=True)
+
+    # ---------------------------
+    # IMPORT
+    # ---------------------------
+    def _iter_rows(self):
+        """Yield the source rows one by one, never holding more than one in memory"""
+        self.ensure_one()
+        with open(self.file_path, newline='', encoding='utf-8') as source:
+            if self.file_format == 'csv':
+                yield from csv.DictReader(source)
+            else:
+                for line in source:
+                    if line.strip():
+                        yield json.loads(line)
+
+    def _run(self, auto_commit=False):
+        """Import the remaining rows chunk by chunk, updating the checkpoint after each chunk"""
+        self.ensure_one()
+        self.write({'state': 'running', 'last_error': False})
+        if auto_commit:
+            self.env.cr.commit()
+        start = time.perf_counter()
+        imported = 0
+        rows = islice(self._iter_rows(), self.rows_done, None)
+        try:
+            while chunk := list(islice(rows, self.chunk_size)):
+                created = self._import_chunk(chunk, first_row=self.rows_done + 1)
+                imported += len(chunk)
+                self.write({
+                    'rows_done': self.rows_done + len(chunk),
+                    'assessments_created': self.assessments_created + created,
+                    'rows_per_second': imported / (time.perf_counter() - start),
+                })
+                _logger.info("Assessment import %s: %d rows (%.0f rows/s)",
+                             self.name, self.rows_done, self.rows_per_second)
+                if auto_commit:
+                    self.env.cr.commit()
+        except Exception as e:
+            if not auto_commit:
+                raise
+            self.env.cr.rollback()
+            self.write({'state': 'failed', 'last_error': str(e)})
+            self.env.cr.commit()
+            _logger.exception("Assessment import %s failed after %d rows", self.name, self.rows_done)
+            return
+        self._snapshot_imported()
+        self.write({'state': 'done'})
+        if auto_commit:
+            self.env.cr.commit()
+
+    def _snapshot_imported(self):
+        """Snapshot the imported completed assessments left without one by the chunks"""
+        Assessment = self.env['dt.assessment']
+        Assessment.search([
+            ('import_ref', '!=', False),
+            ('state', '=', 'completed'),
+            ('id', 'not in', self.env['dt.maturity.snapshot']._search([]).subselect('assessment_id')),
+        ])._snapshot_completed()
+
+    def _import_chunk(self, rows, first_row):
+        """Insert one chunk of answer rows and return the number of assessments created.
+
+        Assessments and lines are each created with one batched create, so the
+        line scores, assessment aggregates and client maturity fields are
+        recomputed once for the whole chunk when it is flushed.
+        """
+        env = self.env(context=dict(self.env.context, tracking_disable=True))
+        Assessment = env['dt.assessment']
+        questionnaire_id, questions = env['dt.assessment.questionnaire']._get_active_snapshot()
+        questions_by_template = {question[1]: question for question in questions}
+
+        refs = list({str(row['assessment_ref']) for row in rows})
+        assessments = {
+            assessment.import_ref: assessment.id
+            for assessment in Assessment.search([('import_ref', 'in', refs)])
+        }
+        new_assessments = {}
+        for row in rows:
+            ref = str(row['assessment_ref'])
+            if ref not in assessments and ref not in new_assessments:
+                new_assessments[ref] = {
+                    'import_ref': ref,
+                    'name': row.get('assessment_name') or f"Assessment {ref}",
+                    'client_id': int(row['client_id']),
+                    'consultant_id': int(row['consultant_id']),
+                    'assessment_date': row['assessment_date'],
+                    'completion_date': row['assessment_date'],
+                    'state': row.get('state') or 'completed',
+                    'questionnaire_id': questionnaire_id,
+                }
+        if new_assessments:
+            created = Assessment.create(list(new_assessments.values()))
+            assessments.update(zip(new_assessments, created.ids))
+
+        line_vals = []
+        for row_number, row in enumerate(rows, start=first_row):
+            question = questions_by_template.get(int(row['question_id']))
+            if not question:
+                raise ValidationError(f"Row {row_number}: unknown or inactive question {row['question_id']}.")
+            answer = str(row.get('answer') or '').strip()
+            if answer and answer not in ANSWERS:
+                raise ValidationError(f"Row {row_number}: invalid answer {answer!r}.")
+            question_id, template_id, category, weight = question
+            line_vals.append({
+                'assessment_id': assessments[str(row['assessment_ref'])],
+                'version_question_id': question_id,
+                'question_id': template_id,
+                'category': category,
+                'weight': weight,
+                'answer': answer or False,
+                'notes': row.get('notes') or False,
+            })
+        env['dt.assessment.line'].create(line_vals)
+        env.flush_all()
+        # the answers of the last assessment may continue in the next chunk: it is snapshotted there or at the end
+        pending_ref = str(rows[-1]['assessment_ref'])
+        Assessment.browse([
+            assessment_id for ref, assessment_id in assessments.items() if ref != pending_ref
+        ])._snapshot_completed()
+        # keep the cache from growing with the number of chunks
+        env.invalidate_all()
+        return len(new_assessments)
@@ -0,0 +1,285 @@
+import json
+import logging
+import random
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+CLIENT_LIST_FIELDS = ['name', 'industry_type', 'company_size', 'digital_maturity_score', 'maturity_level',
+                      'status', 'assessment_count', 'project_count', 'onboarding_date']
+CLIENT_KANBAN_FIELDS = ['name', 'digital_maturity_score', 'maturity_level', 'industry_type',
+                        'assessment_count', 'project_count']
+CONSULTANT_LIST_FIELDS = ['name', 'title', 'department', 'seniority_level', 'availability',
+                          'capacity_percentage', 'projects_managed', 'client_satisfaction_avg']
+
+
+class Benchmark(models.AbstractModel):
+    """Synthetic data generator and benchmark suite for the accelerator models.
+
+    Meant to be run from ``odoo-bin shell`` on a scratch database::
+
+        env['dt.benchmark']._generate_dataset(clients=1000, seed=7)
+        results = env['dt.benchmark']._run_benchmarks(output_path='/tmp/dt_bench.json')
+
+    The methods are private: they create data in bulk and read or write
+    server files, so they are not callable over RPC.
+    """
+    _name = 'dt.benchmark'
+    _description = 'Digital Transformation Benchmark'
+
+    # ---------------------------
+    # DATA GENERATION
+    # ---------------------------
+    @api.model
+    def _generate_dataset(self, clients=100, assessments_per_client=3, lines_per_assessment=None,
+                          projects_per_client=1, phases_per_project=6, tasks_per_phase=5,
+                          milestones_per_project=3, deliverables_per_project=3, consultants=50, seed=42):
+        """Create a reproducible synthetic dataset and return the number of records created per model.
+
+        The same ``seed`` and sizes always produce the same data. Every level is
+        created with one batched ``create`` call. ``lines_per_assessment``
+        defaults to the number of active question templates.
+        """
+        rng = random.Random(seed)
+        env = self.env
+        tag = f"bench-{seed}"
+        industries = [key for key, _label in env['dt.client.company']._fields['industry_type'].selection]
+        sizes = [key for key, _label in env['dt.client.company']._fields['company_size'].selection]
+        seniorities = [key for key, _label in env['dt.consultant']._fields['seniority_level'].selection]
+        answers = [key for key, _label in env['dt.assessment.line']._fields['answer'].selection]
+
+        consultant_records = env['dt.consultant'].create([{
+            'name': f"{tag} consultant {i}",
+            'seniority_level': rng.choice(seniorities),
+            'capacity_percentage': rng.choice([50.0, 80.0, 100.0]),
+        } for i in range(consultants)])
+
+        partners = env['res.partner'].create([{'name': f"{tag} client {i}"} for i in range(clients)])
+        client_records = env['dt.client.company'].create([{
+            'name': partner.name,
+            'partner_id': partner.id,
+            'industry_type': rng.choice(industries),
+            'company_size': rng.choice(sizes),
+            'onboarding_date': date(2020, 1, 1) + timedelta(days=rng.randrange(1500)),
+        } for partner in partners])
+
+        assessment_records = env['dt.assessment'].create([{
+            'name': f"{tag} assessment {client.id}/{i}",
+            'client_id': client.id,
+            'consultant_id': rng.choice(consultant_records).id,
+            'assessment_date': date(2021, 1, 1) + timedelta(days=rng.randrange(1400)),
+        } for client in client_records for i in range(assessments_per_client)])
+        assessment_records.write({'state': 'in_progress'})
+        lines = self._generate_assessment_lines(assessment_records, lines_per_assessment, rng, answers)
+
+        project_records = env['dt.project'].create([{
+            'name': f"{tag} project {client.id}/{i}",
+            'client_id': client.id,
+            'project_manager_id': rng.choice(consultant_records).id,
+            'team_members': [(6, 0, rng.sample(consultant_records.ids, min(3, len(consultant_records))))],
+            'start_date': date(2021, 1, 1) + timedelta(days=rng.randrange(1400)),
+            'estimated_budget': rng.randrange(10000, 500000),
+            'actual_budget': rng.randrange(10000, 500000),
+            'satisfaction_score': rng.choice([0.0, 3.0, 4.0, 5.0]),
+        } for client in client_records for i in range(projects_per_client)])
+        phase_records = env['dt.project.phase'].create([{
+            'name': f"Phase {i + 1}",
+            'project_id': project.id,
+            'sequence': i + 1,
+            'weight': 100 // phases_per_project,
+            'responsible_id': rng.choice(consultant_records).id,
+            'start_date': project.start_date + timedelta(weeks=4 * i),
+            'end_date': project.start_date + timedelta(weeks=4 * (i + 1)),
+        } for project in project_records for i in range(phases_per_project)])
+        task_records = env['dt.project.task'].create([{
+            'name': f"Task {i + 1}",
+            'phase_id': phase.id,
+            'assigned_to': rng.choice(consultant_records).id,
+            'state': rng.choice(['todo', 'in_progress', 'done', 'blocked']),
+        } for phase in phase_records for i in range(tasks_per_phase)])
+        milestone_records = env['dt.project.milestone'].create([{
+            'name': f"Milestone {i + 1}",
+            'project_id': project.id,
+            'target_date': project.start_date + timedelta(weeks=8 * (i + 1)),
+            'importance': rng.choice(['low', 'medium', 'high']),
+        } for project in project_records for i in range(milestones_per_project)])
+        deliverable_records = env['dt.project.deliverable'].create([{
+            'name': f"Deliverable {i + 1}",
+            'project_id': project.id,
+            'due_date': project.start_date + timedelta(weeks=6 * (i + 1)),
+            'responsible_id': rng.choice(consultant_records).id,
+        } for project in project_records for i in range(deliverables_per_project)])
+        self.env.flush_all()
+
+        counts = {
+            'dt.consultant': len(consultant_records),
+            'dt.client.company': len(client_records),
+            'dt.assessment': len(assessment_records),
+            'dt.assessment.line': len(lines),
+            'dt.project': len(project_records),
+            'dt.project.phase': len(phase_records),
+            'dt.project.task': len(task_records),
+            'dt.project.milestone': len(milestone_records),
+            'dt.project.deliverable': len(deliverable_records),
+        }
+        _logger.info("Generated benchmark dataset (seed %s): %s", seed, counts)
+        return counts
+
+    @api.model
+    def _generate_assessment_lines(self, assessments, lines_per_assessment, rng, answers):
+        """Create the questionnaire of ``assessments`` and answer about two thirds of it"""
+        questionnaire_id, questions = self.env['dt.assessment.questionnaire']._get_active_snapshot()
+        if not questions:
+            return self.env['dt.assessment.line']
+        assessments.write({'questionnaire_id': questionnaire_id})
+        count = lines_per_assessment or len(questions)
+        vals_list = []
+        for assessment in assessments:
+            for i in range(count):
+                question_id, template_id, category, weight = questions[i % len(questions)]
+                vals_list.append({
+                    'assessment_id': assessment.id,
+                    'version_question_id': question_id,
+                    'question_id': template_id,
+                    'category': category,
+                    'weight': weight,
+                    'answer': rng.choice(answers) if rng.random() < 0.66 else False,
+                })
+        return self.env['dt.assessment.line'].create(vals_list)
+
+    # ---------------------------
+    # BENCHMARKS
+    # ---------------------------
+    @contextmanager
+    def _measure(self, results, name):
+        """Record query count, wall time and peak Python memory of the enclosed block"""
+        self.env.flush_all()
+        self.env.invalidate_all()
+        cr = self.env.cr
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        queries = cr.sql_log_count
+        start = time.perf_counter()
+        try:
+            yield
+            self.env.flush_all()
+        finally:
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            if not tracing:
+                tracemalloc.stop()
+            results[name] = {
+                'queries': cr.sql_log_count - queries,
+                'wall_ms': round(elapsed * 1000, 2),
+                'peak_kib': round(peak / 1024, 1),
+            }
+
+    @api.model
+    def _run_benchmarks(self, sample_size=50, output_path=None, rollback=True):
+        """Benchmark the hot operations on the current data and return machine-readable results.
+
+        Operations that modify data run inside a savepoint that is rolled back
+        unless ``rollback`` is False. The result is a JSON-serializable dict and
+        is also written to ``output_path`` when given.
+        """
+        Client = self.env['dt.client.company']
+        Consultant = self.env['dt.consultant']
+        Assessment = self.env['dt.assessment']
+        results = {}
+
+        with self._measure(results, 'client_list_load'):
+            Client.search_read([], CLIENT_LIST_FIELDS, limit=80)
+        with self._measure(results, 'client_kanban_load'):
+            Client.search_read([], CLIENT_KANBAN_FIELDS, limit=40, order='status, name')
+        with self._measure(results, 'consultant_list_load'):
+            Consultant.search_read([], CONSULTANT_LIST_FIELDS, limit=80)
+
+        cr = self.env.cr
+        with cr.savepoint() as savepoint:
+            clients = Client.search([], limit=sample_size)
+            consultant = Consultant.search([], limit=1)
+            if clients and consultant:
+                drafts = Assessment.create([{
+                    'name': f"Benchmark - {client.name}",
+                    'client_id': client.id,
+                    'consultant_id': consultant.id,
+                } for client in clients])
+                with self._measure(results, 'action_start_assessment_single'):
+                    drafts[:1].action_start_assessment()
+                with self._measure(results, 'action_start_assessment_batch'):
+                    drafts[1:].action_start_assessment()
+
+                assessment = drafts[0]
+                answers = [key for key, _label in self.env['dt.assessment.line']._fields['answer'].selection]
+                with self._measure(results, 'answer_full_questionnaire'):
+                    assessment.write({'assessment_line_ids': [
+                        (1, line.id, {'answer': answers[i % len(answers)]})
+                        for i, line in enumerate(assessment.assessment_line_ids)
+                    ]})
+                if len(drafts) > 1:
+                    with self._measure(results, 'submit_answers_batch'):
+                        drafts[1].submit_answers({
+                            line.id: answers[i % len(answers)]
+                            for i, line in enumerate(drafts[1].assessment_line_ids)
+                        })
+                assessment.write({'state': 'review'})
+                with self._measure(results, 'action_complete'):
+                    assessment.action_complete()
+            if rollback:
+                savepoint.rollback()
+        if rollback:
+            self.env.invalidate_all()
+
+        report = {
+            'meta': {
+                'database': cr.dbname,
+                'timestamp': fields.Datetime.to_string(fields.Datetime.now()),
+                'sizes': {
+                    model: self.env[model].search_count([])
+                    for model in ('dt.client.company', 'dt.assessment', 'dt.assessment.line',
+                                  'dt.project', 'dt.project.phase', 'dt.project.task', 'dt.consultant')
+                },
+            },
+            'results': results,
+        }
+        _logger.info("Benchmark results: %s", json.dumps(results, sort_keys=True))
+        if output_path:
+            with open(output_path, 'w') as output:
+                json.dump(report, output, indent=2, sort_keys=True)
+        return report
+
+    @api.model
+    def _compare_results(self, baseline, current, tolerance=0.1):
+        """Return the operations of ``current`` that regressed against ``baseline``.
+
+        Both arguments are reports returned by :meth:`_run_benchmarks` (or their
+        JSON file paths). Query counts must not increase; wall time and peak
+        memory may grow by ``tolerance`` before being reported.
+        """
+        if isinstance(baseline, str):
+            with open(baseline) as file:
+                baseline = json.load(file)
+        if isinstance(current, str):
+            with open(current) as file:
+                current = json.load(file)
+        regressions = {}
+        for name, measure in current['results'].items():
+            reference = baseline['results'].get(name)
+            if not reference:
+                continue
+            worse = {}
+            if measure['queries'] > reference['queries']:
+                worse['queries'] = (reference['queries'], measure['queries'])
+            for metric in ('wall_ms', 'peak_kib'):
+                if measure[metric] > reference[metric] * (1 + tolerance):
+                    worse[metric] = (reference[metric], measure[metric])
+            if worse:
+                regressions[name] = worse
+        return regressions
@@ -0,0 +1,107 @@
+from markupsafe import Markup
+
+from odoo import models, fields, api
+
+BULK_TRACKING_CONTEXT_KEY = 'dt_bulk_tracking'
+# records named in the summary message of a bulk operation
+SUMMARY_RECORD_LIMIT = 20
+
+
+class BulkOperationMixin(models.AbstractModel):
+    """Batch writes on dt.* records without per-record mail tracking"""
+    _name = 'dt.bulk.mixin'
+    _description = 'Digital Transformation Bulk Operation Mixin'
+
+    def _bulk_write(self, vals, operation, track=None):
+        """Write ``vals`` on the records with mail tracking disabled and log one summary message.
+
+        With ``track`` (default: the ``dt_bulk_tracking`` context key), the
+        changes of tracked fields are still recorded as one tracking
+        notification per record, but the messages and tracking values of the
+        whole batch are created with one batched create each instead of one
+        message_post per record. A single record takes the regular tracked
+        write.
+        """
+        if len(self) <= 1:
+            return self.write(vals)
+        if track is None:
+            track = self.env.context.get(BULK_TRACKING_CONTEXT_KEY, False)
+        tracked = sorted(set(self._track_get_fields()).intersection(vals)) if track else []
+        initial_values = {record.id: {fname: record[fname] for fname in tracked} for record in self}
+        result = self.with_context(tracking_disable=True).write(vals)
+        if tracked:
+            self._bulk_log_tracking(tracked, initial_values)
+        self.env['dt.bulk.operation']._log(self, operation, vals, tracked=bool(tracked))
+        return result
+
+    def _bulk_log_tracking(self, fnames, initial_values):
+        """Create the tracking notifications of the batch with one create per model"""
+        Tracking = self.env['mail.tracking.value'].sudo()
+        fields_info = self.fields_get(fnames, ['string', 'type', 'selection', 'currency_field'])
+        subtype_id = self.env['ir.model.data']._xmlid_to_res_id('mail.mt_note')
+        message_vals_list = []
+        tracking_vals_list = []
+        for record in self:
+            tracking_vals = [
+                Tracking._create_tracking_values(
+                    initial_values[record.id][fname], record[fname], fname, fields_info[fname], record)
+                for fname in fnames if initial_values[record.id][fname] != record[fname]
+            ]
+            if tracking_vals:
+                message_vals_list.append({
+                    'model': self._name,
+                    'res_id': record.id,
+                    'message_type': 'notification',
+                    'subtype_id': subtype_id,
+                    'author_id': self.env.user.partner_id.id,
+                    'body': '',
+                })
+                tracking_vals_list.append(tracking_vals)
+        messages = self.env['mail.message'].sudo().create(message_vals_list)
+        Tracking.create([
+            dict(tracking_vals, mail_message_id=message.id)
+            for message, message_tracking_vals in zip(messages, tracking_vals_list)
+            for tracking_vals in message_tracking_vals
+        ])
+
+
+class BulkOperation(models.Model):
+    """Log of a bulk operation, carrying its summary message"""
+    _name = 'dt.bulk.operation'
+    _description = 'Digital Transformation Bulk Operation'
+    _inherit = ['mail.thread']
+    _order = 'id desc'
+
+    name = fields.Char(string='Operation', required=True, readonly=True)
+    res_model = fields.Char(string='Model', required=True, readonly=True, index=True)
+    record_count = fields.Integer(string='Records', readonly=True)
+    tracked = fields.Boolean(string='Tracking Recorded', readonly=True)
+    user_id = fields.Many2one('res.users', string='Done By', readonly=True, default=lambda self: self.env.user)
+
+    @api.model
+    def _log(self, records, operation, vals, tracked=False):
+        """Record the operation and post its summary as a single chatter message"""
+        log = self.sudo().with_context(tracking_disable=True).create({
+            'name': f"{records._description}: {operation}",
+            'res_model': records._name,
+            'record_count': len(records),
+            'tracked': tracked,
+        })
+        changes = Markup('').join(
+            Markup('<li>%s: %s</li>') % (records._fields[fname].string, self._format_value(records._fields[fname], value))
+            for fname, value in vals.items()
+        )
+        names = ', '.join(records[:SUMMARY_RECORD_LIMIT].mapped('display_name'))
+        if len(records) > SUMMARY_RECORD_LIMIT:
+            names += f" and {len(records) - SUMMARY_RECORD_LIMIT} more"
+        log.message_post(
+            body=Markup('<p>%s on %s records: %s</p><ul>%s</ul>') % (operation, len(records), names, changes),
+            subtype_xmlid='mail.mt_note',
+        )
+        return log
+
+    @api.model
+    def _format_value(self, field, value):
+        if field.type == 'selection':
+            return dict(field._description_selection(self.env)).get(value, value)
+        return value
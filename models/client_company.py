@@ -1,8 +1,30 @@
 # models/client_company.py
 # -*- coding: utf-8 -*-
 
+import functools
+import logging
+
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
+from odoo.modules import module as odoo_module
+from odoo.tools import str2bool
+
+from .perf_sample import instrumented
+
+_logger = logging.getLogger(__name__)
+
+MATURITY_DEFERRED_PARAM = 'digital_transformation_accelerator.maturity_deferred'
+MATURITY_SYNC_CONTEXT_KEY = 'dt_maturity_sync'
+MATURITY_QUEUE_KEY = 'dt.client.maturity.queue'
+MATURITY_FIELDS = ('latest_assessment_id', 'latest_assessment_date', 'latest_assessment_state',
+                   'latest_assessment_score', 'digital_maturity_score', 'maturity_level')
+
+
+def _maturity_deferred(env):
+    """Maturity fields are deferred when the system parameter says so, except in tests and sync contexts"""
+    if env.context.get(MATURITY_SYNC_CONTEXT_KEY) or odoo_module.current_test:
+        return False
+    return str2bool(env['ir.config_parameter'].sudo().get_param(MATURITY_DEFERRED_PARAM, 'False'))
 
 
 class ClientCompany(models.Model):
@@ -11,7 +33,7 @@ class ClientCompany(models.Model):
     """
     _name = 'dt.client.company'
     _description = 'Digital Transformation Client Company'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'dt.bulk.mixin']
     _order = 'name'
 
     # Basic Information
@@ -94,6 +116,25 @@ class ClientCompany(models.Model):
         ('advanced', 'Advanced'),
         ('expert', 'Digital Expert'),
     ], string='Maturity Level', compute='_compute_maturity_level', store=True)
+
+    peer_rank_total = fields.Integer(
+        string='Peer Rank',
+        readonly=True,
+        aggregator='avg',
+        help="Percentile rank (0-100) of the latest completed assessment among the clients "
+             "of the same industry and company size"
+    )
+    peer_rank_technology = fields.Integer(string='Technology Peer Rank', readonly=True, aggregator='avg')
+    peer_rank_process = fields.Integer(string='Process Peer Rank', readonly=True, aggregator='avg')
+    peer_rank_people = fields.Integer(string='People & Skills Peer Rank', readonly=True, aggregator='avg')
+    peer_rank_culture = fields.Integer(string='Culture Peer Rank', readonly=True, aggregator='avg')
+
+    maturity_stale = fields.Boolean(
+        string='Maturity Refresh Pending',
+        compute='_compute_maturity_stale',
+        search='_search_maturity_stale',
+        help="The maturity figures are queued for a background recompute and may be out of date"
+    )
     
     # Assessment History 
     assessment_ids = fields.One2many(
@@ -101,14 +142,29 @@ class ClientCompany(models.Model):
         'client_id',
         string='Assessments'
     )
+
+    maturity_snapshot_ids = fields.One2many(
+        'dt.maturity.snapshot',
+        'client_id',
+        string='Maturity History'
+    )
     
     assessment_count = fields.Integer(
         string='Assessment Count',
         compute='_compute_assessment_count',
+        store=True,
+        index=True,
         default=0
     )
 
     # 🔹 Latest Assessment Details (regardless of state)
+    latest_assessment_id = fields.Many2one(
+        'dt.assessment',
+        string='Latest Assessment',
+        compute='_compute_latest_assessment_id',
+        store=True
+    )
+
     latest_assessment_date = fields.Date(
         string='Latest Assessment Date',
         compute='_compute_latest_assessment',
@@ -144,10 +200,18 @@ class ClientCompany(models.Model):
     project_count = fields.Integer(
         string='Project Count',
         compute='_compute_project_count',
+        store=True,
+        index=True,
         default=0
     )
 
     # 🔹 Latest Project Details
+    latest_project_id = fields.Many2one(
+        'dt.project',
+        string='Latest Project',
+        compute='_compute_latest_project_id',
+        store=True
+    )
     latest_project_start_date = fields.Date(
         string='Latest Project Start Date',
         compute='_compute_latest_project',
@@ -210,20 +274,18 @@ class ClientCompany(models.Model):
     # ---------------------------
     # COMPUTED FIELDS
     # ---------------------------
-    @api.depends('assessment_ids', 'assessment_ids.total_score')
+    @api.depends('latest_assessment_id.total_score')
+    @instrumented
     def _compute_digital_maturity_score(self):
         """Compute the latest digital maturity score from assessments"""
-        for record in self:
-            latest_assessment = record.assessment_ids.sorted('assessment_date', reverse=True)[:1]
-            if latest_assessment:
-                record.digital_maturity_score = latest_assessment.total_score
-            else:
-                record.digital_maturity_score = 0.0
+        for record in self - self._defer_maturity():
+            record.digital_maturity_score = record.latest_assessment_id.total_score
     
     @api.depends('digital_maturity_score')
+    @instrumented
     def _compute_maturity_level(self):
         """Determine maturity level based on score"""
-        for record in self:
+        for record in self - self._defer_maturity():
             score = record.digital_maturity_score
             if score >= 80:
                 record.maturity_level = 'expert'
@@ -237,46 +299,127 @@ class ClientCompany(models.Model):
                 record.maturity_level = 'beginner'
     
     @api.depends('assessment_ids')
+    @instrumented
     def _compute_assessment_count(self):
         """Count total assessments for this client"""
+        counts = self._child_counts('dt.assessment')
         for record in self:
-            record.assessment_count = len(record.assessment_ids)
+            record.assessment_count = counts.get(record._origin.id, 0)
 
-    @api.depends('assessment_ids')
+    @api.depends('assessment_ids', 'assessment_ids.assessment_date')
+    @instrumented
+    def _compute_latest_assessment_id(self):
+        """Point each client at its most recent assessment with one DISTINCT ON query"""
+        records = self - self._defer_maturity()
+        latest = records._latest_child_ids('dt.assessment', 'assessment_date DESC')
+        for record in records:
+            record.latest_assessment_id = latest.get(record._origin.id, False)
+
+    @api.depends('latest_assessment_id.assessment_date', 'latest_assessment_id.state',
+                 'latest_assessment_id.total_score')
+    @instrumented
     def _compute_latest_assessment(self):
         """Fetch latest assessment details regardless of state"""
-        for record in self:
-            latest_assessment = record.assessment_ids.sorted('assessment_date', reverse=True)[:1]
-            if latest_assessment:
-                record.latest_assessment_date = latest_assessment.assessment_date
-                record.latest_assessment_state = latest_assessment.state
-                record.latest_assessment_score = latest_assessment.total_score
-            else:
-                record.latest_assessment_date = False
-                record.latest_assessment_state = False
-                record.latest_assessment_score = 0.0
+        for record in self - self._defer_maturity():
+            latest_assessment = record.latest_assessment_id
+            record.latest_assessment_date = latest_assessment.assessment_date
+            record.latest_assessment_state = latest_assessment.state
+            record.latest_assessment_score = latest_assessment.total_score
     
     @api.depends('project_ids')
+    @instrumented
     def _compute_project_count(self):
         """Count total projects for this client"""
+        counts = self._child_counts('dt.project')
         for record in self:
-            record.project_count = len(record.project_ids)
+            record.project_count = counts.get(record._origin.id, 0)
 
-    @api.depends('project_ids')
+    @api.depends('project_ids', 'project_ids.start_date')
+    @instrumented
+    def _compute_latest_project_id(self):
+        """Point each client at its most recent project with one DISTINCT ON query"""
+        latest = self._latest_child_ids('dt.project', 'start_date DESC NULLS LAST')
+        for record in self:
+            record.latest_project_id = latest.get(record._origin.id, False)
+
+    @api.depends('latest_project_id.start_date', 'latest_project_id.target_completion_date',
+                 'latest_project_id.progress', 'latest_project_id.state')
+    @instrumented
     def _compute_latest_project(self):
         """Fetch latest project details regardless of state"""
         for record in self:
-            latest_project = record.project_ids.sorted('start_date', reverse=True)[:1]
-            if latest_project:
-                record.latest_project_start_date = latest_project.start_date
-                record.latest_project_target_completion_date = latest_project.target_completion_date
-                record.latest_project_progress = latest_project.progress
-                record.latest_project_state = latest_project.state
-            else:
-                record.latest_project_start_date = False
-                record.latest_project_target_completion_date = False
-                record.latest_project_progress = 0.0
-                record.latest_project_state = False
+            latest_project = record.latest_project_id
+            record.latest_project_start_date = latest_project.start_date
+            record.latest_project_target_completion_date = latest_project.target_completion_date
+            record.latest_project_progress = latest_project.progress
+            record.latest_project_state = latest_project.state
+
+    def _compute_maturity_stale(self):
+        queued = set(self.env.cr.precommit.data.get(MATURITY_QUEUE_KEY, ()))
+        if self._origin.ids:
+            self.env.cr.execute("SELECT client_id FROM dt_client_maturity_queue WHERE client_id = ANY(%s)",
+                                [self._origin.ids])
+            queued.update(row[0] for row in self.env.cr.fetchall())
+        for record in self:
+            record.maturity_stale = record._origin.id in queued
+
+    def _search_maturity_stale(self, operator, value):
+        if operator not in ('=', '!='):
+            return NotImplemented
+        queued = self.env['dt.client.maturity.queue'].sudo()._search([]).subselect('client_id')
+        return [('id', 'in' if (operator == '=') == bool(value) else 'not in', queued)]
+
+    def _defer_maturity(self):
+        """Return the clients whose maturity fields are left to the background queue.
+
+        In deferred mode the stored clients are enqueued when the transaction
+        commits and their maturity fields keep their current value until the
+        queue is drained; new records are always computed right away.
+        """
+        if not _maturity_deferred(self.env):
+            return self.browse()
+        deferred = self.filtered('id')
+        if deferred:
+            callbacks = self.env.cr.precommit
+            queued = callbacks.data.get(MATURITY_QUEUE_KEY)
+            if queued is None:
+                queued = callbacks.data[MATURITY_QUEUE_KEY] = set()
+                callbacks.add(functools.partial(self.env['dt.client.maturity.queue']._enqueue, queued))
+            queued.update(deferred.ids)
+        return deferred
+
+    def _recompute_maturity(self):
+        """Recompute the maturity fields of the clients as one batch, whatever the mode"""
+        clients = self.with_context(**{MATURITY_SYNC_CONTEXT_KEY: True})
+        for field_name in MATURITY_FIELDS:
+            self.env.add_to_compute(clients._fields[field_name], clients)
+        clients.flush_recordset(list(MATURITY_FIELDS))
+
+    def _child_counts(self, model_name):
+        """Return {client_id: count} of ``model_name`` records with one grouped query"""
+        client_ids = self._origin.ids
+        if not client_ids:
+            return {}
+        return {
+            client.id: count
+            for client, count in self.env[model_name].sudo()._read_group(
+                [('client_id', 'in', client_ids)], ['client_id'], ['__count'])
+        }
+
+    def _latest_child_ids(self, model_name, order):
+        """Return {client_id: child_id} of the first child of ``model_name`` per client in ``order``"""
+        client_ids = self._origin.ids
+        if not client_ids:
+            return {}
+        children = self.env[model_name]
+        children.flush_model()
+        self.env.cr.execute(f"""
+            SELECT DISTINCT ON (client_id) client_id, id
+              FROM {children._table}
+             WHERE client_id = ANY(%s)
+          ORDER BY client_id, {order}, id DESC
+        """, [client_ids])
+        return dict(self.env.cr.fetchall())
     
     # ---------------------------
     # CONSTRAINTS
@@ -295,9 +438,49 @@ class ClientCompany(models.Model):
             if record.annual_revenue < 0:
                 raise ValidationError("Annual revenue cannot be negative")
     
+    # ---------------------------
+    # CRUD
+    # ---------------------------
+    def write(self, vals):
+        regrouped = 'industry_type' in vals or 'company_size' in vals
+        if not regrouped and 'status' not in vals:
+            return super().write(vals)
+        # the client may leave its peer group for another one
+        peer_groups = {(client.industry_type, client.company_size) for client in self}
+        old_statuses = {client.id: client.status for client in self}
+        res = super().write(vals)
+        if regrouped:
+            peer_groups.update((client.industry_type, client.company_size) for client in self)
+            self.env['dt.maturity.benchmark']._mark_dirty(peer_groups)
+        if 'status' in vals:
+            self.env['dt.notification.event']._queue(self, 'status', old_statuses)
+        return res
+
+    # ---------------------------
+    # MAINTENANCE
+    # ---------------------------
+    @api.model
+    def _rebuild_child_counters(self):
+        """Repair assessment_count and project_count of all clients, one GROUP BY per child table"""
+        self.env['dt.assessment'].flush_model(['client_id'])
+        self.env['dt.project'].flush_model(['client_id'])
+        for field_name, table in (('assessment_count', 'dt_assessment'), ('project_count', 'dt_project')):
+            self.env.cr.execute(f"""
+                UPDATE dt_client_company AS c
+                   SET {field_name} = COALESCE(counts.total, 0)
+                  FROM dt_client_company AS cc
+             LEFT JOIN (SELECT client_id, COUNT(*) AS total
+                          FROM {table}
+                      GROUP BY client_id) AS counts ON counts.client_id = cc.id
+                 WHERE cc.id = c.id
+                   AND c.{field_name} IS DISTINCT FROM COALESCE(counts.total, 0)
+            """)
+        self.invalidate_model(['assessment_count', 'project_count'])
+
     # ---------------------------
     # ACTIONS
     # ---------------------------
+    @instrumented
     def action_start_assessment(self):
         return {
             'name': 'New Assessment',
@@ -311,6 +494,7 @@ class ClientCompany(models.Model):
             'target': 'current',
         }
     
+    @instrumented
     def action_create_project(self):
         return {
             'name': 'New Project',
@@ -324,6 +508,7 @@ class ClientCompany(models.Model):
             'target': 'current',
         }
     
+    @instrumented
     def action_view_assessments(self):
         return {
             'name': 'Client Assessments',
@@ -334,6 +519,7 @@ class ClientCompany(models.Model):
             'context': {'default_client_id': self.id},
         }
     
+    @instrumented
     def action_view_projects(self):
         return {
             'name': 'Client Projects',
@@ -343,3 +529,59 @@ class ClientCompany(models.Model):
             'domain': [('client_id', '=', self.id)],
             'context': {'default_client_id': self.id},
         }
+
+
+class ClientMaturityQueue(models.Model):
+    """Clients whose maturity fields wait for the background recompute"""
+    _name = 'dt.client.maturity.queue'
+    _description = 'Client Maturity Recompute Queue'
+    _order = 'id'
+    _log_access = False
+
+    client_id = fields.Many2one('dt.client.company', string='Client', required=True, ondelete='cascade')
+    enqueued_at = fields.Datetime(string='Enqueued On', required=True, default=fields.Datetime.now)
+
+    _sql_constraints = [
+        ('client_unique', 'unique(client_id)', 'A client is queued at most once.'),
+    ]
+
+    @api.model
+    def _enqueue(self, client_ids):
+        """Queue the given clients, skipping the ones already queued or deleted meanwhile"""
+        if not client_ids:
+            return
+        self.env.cr.execute("""
+            INSERT INTO dt_client_maturity_queue (client_id, enqueued_at)
+                 SELECT id, NOW() AT TIME ZONE 'UTC'
+                   FROM dt_client_company
+                  WHERE id = ANY(%s)
+               ORDER BY id
+            ON CONFLICT (client_id) DO NOTHING
+        """, [list(client_ids)])
+
+    @api.model
+    def _cron_process_queue(self, batch_size=1000):
+        """Drain the queue in batches, recomputing each batch with one set-based recompute.
+
+        A batch is removed from the queue and recomputed in the same
+        transaction; a client modified meanwhile waits on the removed row and
+        is queued again once the batch commits, so no update is lost.
+        """
+        cr = self.env.cr
+        Client = self.env['dt.client.company']
+        while True:
+            cr.execute("""
+                DELETE FROM dt_client_maturity_queue
+                 WHERE id IN (SELECT id
+                                FROM dt_client_maturity_queue
+                            ORDER BY id
+                               LIMIT %s
+                                 FOR UPDATE SKIP LOCKED)
+             RETURNING client_id
+            """, [batch_size])
+            client_ids = [row[0] for row in cr.fetchall()]
+            if not client_ids:
+                break
+            Client.browse(client_ids)._recompute_maturity()
+            cr.commit()
+            _logger.info("Recomputed the maturity of %d queued clients", len(client_ids))
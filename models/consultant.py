@@ -1,11 +1,19 @@
-from odoo import models, fields, api
+from datetime import timedelta
+
+from odoo import models, fields, api, tools
+
+from .perf_sample import instrumented
+
+SKILL_INDEX_DIRTY_KEY = 'dt.consultant.skill_index'
+# consultant fields held in the skill index
+SKILL_INDEX_FIELDS = {'skill_ids', 'seniority_level', 'availability', 'capacity_percentage', 'active'}
 
 
 class Consultant(models.Model):
     """Consultant/Employee Model for Digital Transformation"""
     _name = 'dt.consultant'
     _description = 'Digital Transformation Consultant'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'dt.bulk.mixin']
     
     name = fields.Char(string='Full Name', required=True, tracking=True)
     employee_id = fields.Many2one('hr.employee', string='HR Employee Record', ondelete='set null')
@@ -45,11 +53,21 @@ class Consultant(models.Model):
     ], string='Availability', default='available')
     
     capacity_percentage = fields.Float(string='Current Capacity %', default=100.0)
+    load_ids = fields.One2many('dt.consultant.load', 'consultant_id', string='Weekly Load', readonly=True)
+    current_load = fields.Float(string='Allocated This Week %', compute='_compute_current_load')
     
     # Performance Metrics
-    projects_managed = fields.Integer(string='Projects Managed', compute='_compute_project_stats')
-    projects_participated = fields.Integer(string='Projects Participated', compute='_compute_project_stats')
-    client_satisfaction_avg = fields.Float(string='Avg Client Satisfaction', compute='_compute_satisfaction')
+    managed_project_ids = fields.One2many('dt.project', 'project_manager_id', string='Managed Projects')
+    team_project_ids = fields.Many2many(
+        'dt.project',
+        'dt_project_team_rel',
+        'consultant_id',
+        'project_id',
+        string='Team Projects'
+    )
+    projects_managed = fields.Integer(string='Projects Managed', compute='_compute_project_stats', store=True)
+    projects_participated = fields.Integer(string='Projects Participated', compute='_compute_project_stats', store=True)
+    client_satisfaction_avg = fields.Float(string='Avg Client Satisfaction', compute='_compute_project_stats', store=True)
     
     # Contact Information
     email = fields.Char(string='Email')
@@ -58,30 +76,222 @@ class Consultant(models.Model):
     # Status
     active = fields.Boolean(string='Active', default=True)
     
-    @api.depends()
+    @api.depends('managed_project_ids', 'managed_project_ids.satisfaction_score', 'team_project_ids')
+    @instrumented
     def _compute_project_stats(self):
+        """Compute project statistics for the whole recordset with grouped aggregates"""
+        consultant_ids = self._origin.ids
+        managed = {}
+        satisfaction = {}
+        participated = {}
+        if consultant_ids:
+            Project = self.env['dt.project']
+            managed = {
+                manager.id: count
+                for manager, count in Project._read_group(
+                    [('project_manager_id', 'in', consultant_ids)],
+                    ['project_manager_id'], ['__count'])
+            }
+            satisfaction = {
+                manager.id: avg
+                for manager, avg in Project._read_group(
+                    [('project_manager_id', 'in', consultant_ids), ('satisfaction_score', '!=', False)],
+                    ['project_manager_id'], ['satisfaction_score:avg'])
+            }
+            Project.flush_model(['team_members'])
+            self.env.cr.execute("""
+                SELECT consultant_id, COUNT(*)
+                  FROM dt_project_team_rel
+                 WHERE consultant_id = ANY(%s)
+              GROUP BY consultant_id
+            """, [consultant_ids])
+            participated = dict(self.env.cr.fetchall())
+
         for record in self:
-            managed_projects = self.env['dt.project'].search_count([
-                ('project_manager_id', '=', record.id)
-            ])
-            participated_projects = self.env['dt.project'].search_count([
-                ('team_members', 'in', [record.id])
-            ])
-            record.projects_managed = managed_projects
-            record.projects_participated = participated_projects + managed_projects
-    
-    @api.depends()
-    def _compute_satisfaction(self):
+            consultant_id = record._origin.id
+            record.projects_managed = managed.get(consultant_id, 0)
+            record.projects_participated = participated.get(consultant_id, 0) + record.projects_managed
+            record.client_satisfaction_avg = satisfaction.get(consultant_id) or 0.0
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        consultants = super().create(vals_list)
+        self._skill_index_changed()
+        return consultants
+
+    def write(self, vals):
+        res = super().write(vals)
+        if SKILL_INDEX_FIELDS.intersection(vals):
+            self._skill_index_changed()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self._skill_index_changed()
+        return res
+
+    def _compute_current_load(self):
+        # read-only: reflects the load matrix as of the last committed rebuild
+        week_start = fields.Date.context_today(self)
+        week_start -= timedelta(days=week_start.weekday())
+        loads = {
+            consultant.id: load
+            for consultant, load in self.env['dt.consultant.load']._read_group(
+                [('consultant_id', 'in', self._origin.ids), ('week_start', '=', week_start)],
+                ['consultant_id'], ['load:sum'])
+        }
         for record in self:
-            projects = self.env['dt.project'].search([
-                ('project_manager_id', '=', record.id),
-                ('satisfaction_score', '!=', False)
-            ])
-            if projects:
-                scores = [float(p.satisfaction_score) for p in projects]
-                record.client_satisfaction_avg = sum(scores) / len(scores)
-            else:
-                record.client_satisfaction_avg = 0.0
+            record.current_load = loads.get(record._origin.id, 0.0)
+
+    @api.model
+    def find_available(self, date_from, date_to, percentage, skill_ids=None, limit=None):
+        """Return the active consultants free for ``percentage`` of their capacity in every week
+        from ``date_from`` to ``date_to``, least loaded first.
+
+        With ``skill_ids``, consultants must have all of the skills. Answered
+        from the weekly load matrix with one grouped query on its
+        (consultant, week) index.
+        """
+        self.env['dt.consultant.load']._flush_dirty()
+        self.flush_model(['active', 'capacity_percentage', 'skill_ids'])
+        date_from = fields.Date.to_date(date_from)
+        date_to = fields.Date.to_date(date_to)
+        skill_ids = list(skill_ids or [])
+        skill_filter = ""
+        if skill_ids:
+            skill_filter = """
+               AND consultant.id IN (SELECT dt_consultant_id
+                                       FROM dt_consultant_dt_skill_rel
+                                      WHERE dt_skill_id = ANY(%(skill_ids)s)
+                                   GROUP BY dt_consultant_id
+                                     HAVING COUNT(*) = %(skill_count)s)"""
+        self.env.cr.execute(f"""
+            SELECT consultant.id
+              FROM dt_consultant consultant
+         LEFT JOIN dt_consultant_load week_load
+                ON week_load.consultant_id = consultant.id
+               AND week_load.week_start BETWEEN %(week_from)s AND %(week_to)s
+             WHERE consultant.active {skill_filter}
+          GROUP BY consultant.id
+            HAVING COALESCE(consultant.capacity_percentage, 0) - COALESCE(MAX(week_load.load), 0) >= %(percentage)s
+          ORDER BY COALESCE(MAX(week_load.load), 0), consultant.id
+             LIMIT %(limit)s
+        """, {
+            'week_from': date_from - timedelta(days=date_from.weekday()),
+            'week_to': date_to - timedelta(days=date_to.weekday()),
+            'percentage': percentage,
+            'skill_ids': skill_ids,
+            'skill_count': len(set(skill_ids)),
+            'limit': limit,
+        })
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
+
+    # ---------------------------
+    # SKILL MATCHING
+    # ---------------------------
+    def _skill_index_changed(self):
+        """Mark the indexed fields as changed by the current transaction"""
+        self.env.cr.precommit.data[SKILL_INDEX_DIRTY_KEY] = True
+
+    @api.model
+    def _get_skill_index(self):
+        """Return the skill index, from the ormcache when this transaction did not change it.
+
+        The cached index is keyed on a fingerprint of the committed consultants
+        (count and write dates) and skill links, so a change committed by any
+        worker yields a new key without clearing the registry caches. A
+        transaction that changed the indexed fields builds its own index, so
+        that its uncommitted state never lands in the shared cache.
+        """
+        self.flush_model(list(SKILL_INDEX_FIELDS))
+        if self.env.cr.precommit.data.get(SKILL_INDEX_DIRTY_KEY):
+            return self._build_skill_index()
+        self.env.cr.execute("""
+            SELECT COUNT(*), SUM(EXTRACT(EPOCH FROM write_date)), (SELECT COUNT(*) FROM dt_consultant_dt_skill_rel)
+              FROM dt_consultant
+        """)
+        return self._skill_index_for_fingerprint(self.env.cr.fetchone())
+
+    @tools.ormcache('fingerprint')
+    def _skill_index_for_fingerprint(self, fingerprint):
+        return self._build_skill_index()
+
+    @api.model
+    def _build_skill_index(self):
+        """Return the skill index of the active consultants as ``(profiles, consultants_by_skill)``.
+
+        ``profiles`` maps each consultant id to ``(skill bitmap, seniority rank,
+        availability, capacity)``, the bitmap having bit ``skill_id`` set for
+        every skill of the consultant; ``consultants_by_skill`` is the inverted
+        index mapping each skill id to the frozenset of its consultants.
+        """
+        seniority_ranks = {key: rank for rank, (key, _label) in enumerate(self._fields['seniority_level'].selection)}
+        self.env.cr.execute("""
+            SELECT consultant.id, consultant.seniority_level, consultant.availability,
+                   consultant.capacity_percentage, ARRAY_REMOVE(ARRAY_AGG(rel.dt_skill_id), NULL)
+              FROM dt_consultant consultant
+         LEFT JOIN dt_consultant_dt_skill_rel rel ON rel.dt_consultant_id = consultant.id
+             WHERE consultant.active
+          GROUP BY consultant.id
+        """)
+        profiles = {}
+        consultants_by_skill = {}
+        for consultant_id, seniority, availability, capacity, skill_ids in self.env.cr.fetchall():
+            bitmap = 0
+            for skill_id in skill_ids:
+                bitmap |= 1 << skill_id
+                consultants_by_skill.setdefault(skill_id, set()).add(consultant_id)
+            profiles[consultant_id] = (bitmap, seniority_ranks.get(seniority, 0), availability, capacity or 0.0)
+        return profiles, {skill_id: frozenset(ids) for skill_id, ids in consultants_by_skill.items()}
+
+    @api.model
+    def match_skills(self, required_skill_ids, optional_skill_ids=(), min_seniority=None,
+                     availability=('available', 'partially_available'), min_capacity=0.0,
+                     date_from=None, date_to=None, min_free=None, limit=10):
+        """Return a ranked shortlist of the consultants having every required skill.
+
+        Candidates are narrowed with the inverted index (rarest required skill
+        first), filtered on seniority, availability and capacity, then ranked by
+        the number of optional skills they cover, their seniority and their id.
+        With ``date_from``, ``date_to`` and ``min_free``, candidates must also be
+        free for ``min_free`` % in every week of the period according to the
+        weekly load matrix. The index is served from the ormcache until a
+        consultant's skills, seniority, availability or capacity change.
+
+        Returns ``[{'consultant_id', 'score', 'optional_matched'}]`` best first.
+        """
+        profiles, consultants_by_skill = self._get_skill_index()
+        required = set(required_skill_ids)
+        if required:
+            postings = sorted((consultants_by_skill.get(skill_id, frozenset()) for skill_id in required), key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+        else:
+            candidates = set(profiles)
+
+        min_rank = 0
+        if min_seniority:
+            min_rank = [key for key, _label in self._fields['seniority_level'].selection].index(min_seniority)
+        candidates = {
+            consultant_id for consultant_id in candidates
+            if profiles[consultant_id][1] >= min_rank
+            and (not availability or profiles[consultant_id][2] in availability)
+            and profiles[consultant_id][3] >= min_capacity
+        }
+        if candidates and date_from and date_to and min_free is not None:
+            candidates &= set(self.find_available(date_from, date_to, min_free, skill_ids=list(required)).ids)
+
+        optional_bitmap = 0
+        for skill_id in set(optional_skill_ids) - required:
+            optional_bitmap |= 1 << skill_id
+        ranking = sorted((
+            ((profiles[consultant_id][0] & optional_bitmap).bit_count(), profiles[consultant_id][1], -consultant_id)
+            for consultant_id in candidates
+        ), reverse=True)
+        return [{
+            'consultant_id': -negated_id,
+            'score': matched * 10 + rank,
+            'optional_matched': matched,
+        } for matched, rank, negated_id in ranking[:limit]]
 
 
 class Skill(models.Model):
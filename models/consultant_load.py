@@ -0,0 +1,96 @@
+from odoo import models, fields, api
+
+LOAD_QUEUE_KEY = 'dt.consultant.load'
+
+
+class ConsultantLoad(models.Model):
+    """Weekly allocation of a consultant, derived from phase and task assignments.
+
+    A phase books its responsible for ``allocation_percentage`` in every week
+    between its start and end dates; a task books its assignee the same way
+    over the dates of its phase. Completed phases, done tasks and closed
+    projects do not count. Rows are rebuilt per consultant when one of their
+    assignments changes, once per transaction.
+    """
+    _name = 'dt.consultant.load'
+    _description = 'Consultant Weekly Load'
+    _order = 'consultant_id, week_start'
+    _log_access = False
+
+    consultant_id = fields.Many2one('dt.consultant', string='Consultant', required=True, readonly=True,
+                                    ondelete='cascade')
+    week_start = fields.Date(string='Week', required=True, readonly=True)
+    load = fields.Float(string='Allocated %', readonly=True, aggregator='max')
+
+    _sql_constraints = [
+        ('consultant_week_unique', 'unique(consultant_id, week_start)', 'A consultant has one load per week.'),
+    ]
+
+    def init(self):
+        self.env.cr.execute("SELECT 1 FROM dt_consultant_load LIMIT 1")
+        if not self.env.cr.fetchone():
+            self._rebuild()
+
+    @api.model
+    def _mark_dirty(self, consultant_ids):
+        """Schedule the rebuild of the given consultants' rows for when the transaction commits"""
+        consultant_ids = {consultant_id for consultant_id in consultant_ids if consultant_id}
+        if not consultant_ids:
+            return
+        callbacks = self.env.cr.precommit
+        dirty = callbacks.data.get(LOAD_QUEUE_KEY)
+        if dirty is None:
+            dirty = callbacks.data[LOAD_QUEUE_KEY] = set()
+            callbacks.add(self._flush_dirty)
+        dirty.update(consultant_ids)
+
+    @api.model
+    def _flush_dirty(self):
+        """Rebuild the rows of the consultants marked dirty so far in this transaction"""
+        dirty = self.env.cr.precommit.data.get(LOAD_QUEUE_KEY)
+        if dirty:
+            self._rebuild(list(dirty))
+            dirty.clear()
+
+    @api.model
+    def _rebuild(self, consultant_ids=None):
+        """Recompute the weekly rows of the given consultants (all when None) with one set-based query"""
+        self.env['dt.project'].flush_model(['state'])
+        self.env['dt.project.phase'].flush_model(['project_id', 'responsible_id', 'start_date', 'end_date',
+                                                  'allocation_percentage', 'state'])
+        self.env['dt.project.task'].flush_model(['phase_id', 'assigned_to', 'allocation_percentage', 'state'])
+        params = {'all': consultant_ids is None, 'ids': list(consultant_ids or [])}
+        cr = self.env.cr
+        cr.execute("""
+            DELETE FROM dt_consultant_load
+             WHERE %(all)s OR consultant_id = ANY(%(ids)s)
+        """, params)
+        cr.execute("""
+            INSERT INTO dt_consultant_load (consultant_id, week_start, load)
+                 SELECT booking.consultant_id, week.week_start::date, SUM(booking.allocation)
+                   FROM (SELECT phase.responsible_id AS consultant_id, phase.start_date, phase.end_date,
+                                phase.allocation_percentage AS allocation
+                           FROM dt_project_phase phase
+                           JOIN dt_project project ON project.id = phase.project_id
+                          WHERE (%(all)s OR phase.responsible_id = ANY(%(ids)s))
+                            AND phase.responsible_id IS NOT NULL
+                            AND phase.state IS DISTINCT FROM 'completed'
+                            AND project.state NOT IN ('completed', 'cancelled')
+                      UNION ALL
+                         SELECT task.assigned_to, phase.start_date, phase.end_date, task.allocation_percentage
+                           FROM dt_project_task task
+                           JOIN dt_project_phase phase ON phase.id = task.phase_id
+                           JOIN dt_project project ON project.id = phase.project_id
+                          WHERE (%(all)s OR task.assigned_to = ANY(%(ids)s))
+                            AND task.assigned_to IS NOT NULL
+                            AND task.state IS DISTINCT FROM 'done'
+                            AND phase.state IS DISTINCT FROM 'completed'
+                            AND project.state NOT IN ('completed', 'cancelled')) AS booking
+             CROSS JOIN LATERAL generate_series(date_trunc('week', booking.start_date),
+                                                date_trunc('week', COALESCE(booking.end_date, booking.start_date)),
+                                                interval '1 week') AS week(week_start)
+                  WHERE booking.start_date IS NOT NULL
+                    AND booking.allocation > 0
+               GROUP BY booking.consultant_id, week.week_start
+        """, params)
+        self.invalidate_model()
@@ -0,0 +1,133 @@
+import csv
+import io
+import json
+import logging
+
+from odoo import models, api
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+# dataset: (model, exported fields); many2one fields are exported as ids
+EXPORT_DATASETS = {
+    'clients': ('dt.client.company', [
+        'name', 'industry_type', 'company_size', 'status', 'onboarding_date', 'digital_maturity_score',
+        'maturity_level', 'assessment_count', 'latest_assessment_id', 'latest_assessment_date',
+        'project_count', 'latest_project_id',
+    ]),
+    'assessments': ('dt.assessment', [
+        'name', 'client_id', 'consultant_id', 'questionnaire_id', 'assessment_date', 'completion_date', 'state',
+        'technology_score', 'process_score', 'people_score', 'culture_score', 'total_score',
+        'answered_line_count',
+    ]),
+    'assessment_lines': ('dt.assessment.line', [
+        'assessment_id', 'version_question_id', 'question_id', 'category', 'weight', 'answer', 'score', 'notes',
+    ]),
+    'projects': ('dt.project', [
+        'name', 'client_id', 'assessment_id', 'project_manager_id', 'state', 'start_date',
+        'target_completion_date', 'actual_completion_date', 'progress', 'estimated_budget', 'actual_budget',
+        'satisfaction_score',
+    ]),
+    'project_phases': ('dt.project.phase', [
+        'project_id', 'sequence', 'name', 'state', 'weight', 'progress', 'responsible_id', 'start_date',
+        'end_date',
+    ]),
+    'project_milestones': ('dt.project.milestone', [
+        'project_id', 'name', 'state', 'importance', 'target_date', 'due_date', 'actual_date', 'achieved',
+    ]),
+    'project_deliverables': ('dt.project.deliverable', [
+        'project_id', 'name', 'state', 'responsible_id', 'due_date', 'delivery_date', 'delivered',
+    ]),
+}
+
+EXPORT_FORMATS = ('csv', 'columnar')
+
+
+class DataExport(models.AbstractModel):
+    """Streaming export of the accelerator data for analytics.
+
+    Rows are read page by page with keyset pagination on ``id`` and the cache
+    is dropped after every page, so memory stays flat whatever the number of
+    rows. Two formats are produced:
+
+    * ``csv``: a header line followed by one line per record;
+    * ``columnar``: one JSON document per page and per line, mapping every
+      column to the list of its values (``{"columns": {...}, "rows": n}``),
+      ready to be appended to a columnar store page by page.
+
+    Used by the ``/dt/export/<dataset>`` controller and the ``dt_export``
+    command line entry point.
+    """
+    _name = 'dt.export'
+    _description = 'Digital Transformation Data Export'
+
+    @api.model
+    def _export_columns(self, dataset):
+        if dataset not in EXPORT_DATASETS:
+            raise UserError(f"Unknown export dataset {dataset!r}, expected one of: {', '.join(EXPORT_DATASETS)}.")
+        return ['id'] + EXPORT_DATASETS[dataset][1]
+
+    @api.model
+    def _iter_pages(self, dataset, page_size=5000):
+        """Yield the rows of ``dataset`` as lists of value tuples, one list per page"""
+        model_name, field_names = EXPORT_DATASETS[dataset]
+        Model = self.env[model_name].with_context(active_test=False)
+        Model.check_access('read')
+        columns = self._export_columns(dataset)
+        last_id = 0
+        while True:
+            records = Model.search_fetch([('id', '>', last_id)], field_names, order='id', limit=page_size)
+            if not records:
+                return
+            page = [tuple(self._export_value(record, name) for name in columns) for record in records]
+            last_id = records[-1].id
+            yield page
+            Model.invalidate_model()
+
+    @api.model
+    def _export_value(self, record, field_name):
+        field = record._fields[field_name]
+        value = record[field_name]
+        if field.type == 'many2one':
+            return value.id or None
+        if field.type in ('date', 'datetime'):
+            return value and value.isoformat() or None
+        if field.type == 'boolean':
+            return value
+        return value if value is not False else None
+
+    @api.model
+    def stream(self, dataset, export_format='csv', page_size=5000):
+        """Yield the export of ``dataset`` as successive text chunks, one per page"""
+        if export_format not in EXPORT_FORMATS:
+            raise UserError(f"Unknown export format {export_format!r}, expected one of: {', '.join(EXPORT_FORMATS)}.")
+        columns = self._export_columns(dataset)
+        if export_format == 'csv':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            for page in self._iter_pages(dataset, page_size):
+                writer.writerows(page)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            for page in self._iter_pages(dataset, page_size):
+                yield json.dumps({
+                    'dataset': dataset,
+                    'rows': len(page),
+                    'columns': dict(zip(columns, map(list, zip(*page)))),
+                }) + '\n'
+
+    @api.model
+    def _export_to_file(self, dataset, path, export_format='csv', page_size=5000):
+        """Write the export of ``dataset`` to ``path`` and return the number of chunks written"""
+        chunks = 0
+        with open(path, 'w', newline='', encoding='utf-8') as output:
+            for chunk in self.stream(dataset, export_format, page_size):
+                output.write(chunk)
+                chunks += 1
+        _logger.info("Exported %s to %s (%d chunks)", dataset, path, chunks)
+        return chunks
@@ -0,0 +1,183 @@
+import bisect
+import logging
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+BENCHMARK_QUEUE_KEY = 'dt.maturity.benchmark'
+BENCHMARK_CATEGORIES = ('technology', 'process', 'people', 'culture', 'total')
+# boundaries of the 1st to the 99th percentile
+PERCENTILE_FRACTIONS = [percentile / 100 for percentile in range(1, 100)]
+RANK_FIELDS = {category: f'peer_rank_{category}' for category in BENCHMARK_CATEGORIES}
+
+# Latest completed assessment scores of each client of the given peer groups (all when %(all)s)
+PEER_SCORES_QUERY = """
+    SELECT DISTINCT ON (snapshot.client_id)
+           snapshot.client_id, client.industry_type, client.company_size,
+           snapshot.technology_score, snapshot.process_score, snapshot.people_score,
+           snapshot.culture_score, snapshot.total_score
+      FROM dt_maturity_snapshot snapshot
+      JOIN dt_client_company client ON client.id = snapshot.client_id
+     WHERE %(all)s
+        OR EXISTS (SELECT 1
+                     FROM unnest(%(industries)s::varchar[], %(sizes)s::varchar[]) AS peer(industry_type, company_size)
+                    WHERE peer.industry_type IS NOT DISTINCT FROM client.industry_type
+                      AND peer.company_size IS NOT DISTINCT FROM client.company_size)
+  ORDER BY snapshot.client_id, snapshot.snapshot_date DESC, snapshot.id DESC
+"""
+
+
+class MaturityBenchmark(models.Model):
+    """Percentile boundaries of the scores of one peer group in one category.
+
+    A peer group is the set of clients sharing an industry and a company
+    size, each client counting with its latest completed assessment. The
+    groups touched by a completed assessment or by a client moving to
+    another group are refreshed once per transaction, together with the
+    stored peer ranks of their clients.
+    """
+    _name = 'dt.maturity.benchmark'
+    _description = 'Peer Maturity Benchmark'
+    _order = 'industry_type, company_size, category'
+    _log_access = False
+
+    industry_type = fields.Selection(
+        selection=lambda self: self.env['dt.client.company']._fields['industry_type'].selection,
+        string='Industry', readonly=True)
+    company_size = fields.Selection(
+        selection=lambda self: self.env['dt.client.company']._fields['company_size'].selection,
+        string='Company Size', readonly=True)
+    category = fields.Selection([
+        ('technology', 'Technology'),
+        ('process', 'Process'),
+        ('people', 'People & Skills'),
+        ('culture', 'Culture'),
+        ('total', 'Total Score'),
+    ], string='Category', required=True, readonly=True)
+    sample_size = fields.Integer(string='Peers', readonly=True)
+    boundaries = fields.Json(string='Percentile Boundaries', readonly=True)
+    first_quartile = fields.Float(string='25th Percentile', readonly=True)
+    median = fields.Float(string='Median', readonly=True)
+    third_quartile = fields.Float(string='75th Percentile', readonly=True)
+
+    def init(self):
+        self.env.cr.execute("SELECT 1 FROM dt_maturity_benchmark LIMIT 1")
+        if not self.env.cr.fetchone():
+            self._refresh()
+
+    @api.model
+    def _mark_dirty(self, peer_groups):
+        """Schedule the refresh of the given (industry, size) groups for when the transaction commits"""
+        if not peer_groups:
+            return
+        callbacks = self.env.cr.precommit
+        dirty = callbacks.data.get(BENCHMARK_QUEUE_KEY)
+        if dirty is None:
+            dirty = callbacks.data[BENCHMARK_QUEUE_KEY] = set()
+            callbacks.add(self._flush_dirty)
+        dirty.update(peer_groups)
+
+    @api.model
+    def _flush_dirty(self):
+        """Refresh the groups marked dirty so far in this transaction"""
+        dirty = self.env.cr.precommit.data.get(BENCHMARK_QUEUE_KEY)
+        if dirty:
+            self._refresh(list(dirty))
+            dirty.clear()
+
+    @api.model
+    def _refresh(self, peer_groups=None):
+        """Recompute the boundaries and the client ranks of the given groups (all when None)"""
+        self.env['dt.client.company'].flush_model(['industry_type', 'company_size'])
+        self.env['dt.maturity.snapshot'].flush_model()
+        params = {
+            'all': peer_groups is None,
+            'industries': [industry or None for industry, _size in peer_groups or ()],
+            'sizes': [size or None for _industry, size in peer_groups or ()],
+            'fractions': PERCENTILE_FRACTIONS,
+        }
+        cr = self.env.cr
+        cr.execute("""
+            DELETE FROM dt_maturity_benchmark benchmark
+             WHERE %(all)s
+                OR EXISTS (SELECT 1
+                             FROM unnest(%(industries)s::varchar[], %(sizes)s::varchar[])
+                                  AS peer(industry_type, company_size)
+                            WHERE peer.industry_type IS NOT DISTINCT FROM benchmark.industry_type
+                              AND peer.company_size IS NOT DISTINCT FROM benchmark.company_size)
+        """, params)
+        cr.execute(f"""
+            WITH peer_score AS ({PEER_SCORES_QUERY})
+            INSERT INTO dt_maturity_benchmark (industry_type, company_size, category, sample_size, boundaries,
+                                               first_quartile, median, third_quartile)
+                 SELECT industry_type, company_size, category, sample_size, to_jsonb(boundaries),
+                        boundaries[25], boundaries[50], boundaries[75]
+                   FROM (SELECT peer_score.industry_type, peer_score.company_size, score.category,
+                                COUNT(*) AS sample_size,
+                                percentile_cont(%(fractions)s::float8[]) WITHIN GROUP (ORDER BY score.value)
+                                    AS boundaries
+                           FROM peer_score
+                     CROSS JOIN LATERAL (VALUES ('technology', peer_score.technology_score),
+                                                ('process', peer_score.process_score),
+                                                ('people', peer_score.people_score),
+                                                ('culture', peer_score.culture_score),
+                                                ('total', peer_score.total_score)) AS score(category, value)
+                       GROUP BY peer_score.industry_type, peer_score.company_size, score.category) AS peer_group
+              RETURNING industry_type, company_size, category, boundaries
+        """, params)
+        compiled = {}
+        for industry, size, category, boundaries in cr.fetchall():
+            compiled.setdefault((industry or False, size or False), {})[category] = tuple(boundaries or ())
+        self.invalidate_model()
+        self._update_client_ranks(params, compiled)
+
+    @api.model
+    def _update_client_ranks(self, params, compiled):
+        """Store the peer ranks of the clients of the refreshed groups with one UPDATE.
+
+        ``compiled`` maps each refreshed ``(industry, size)`` group to its
+        ``{category: boundaries}``, as returned by the insertion of the group.
+        """
+        self.env.cr.execute(PEER_SCORES_QUERY, params)
+        rows = self.env.cr.fetchall()
+        client_ids = [row[0] for row in rows]
+        ranks = {category: [] for category in BENCHMARK_CATEGORIES}
+        for _client_id, industry, size, *scores in rows:
+            group = compiled.get((industry or False, size or False), {})
+            for category, score in zip(BENCHMARK_CATEGORIES, scores):
+                ranks[category].append(self._percentile_rank(group.get(category, ()), score or 0.0))
+        columns = [RANK_FIELDS[category] for category in BENCHMARK_CATEGORIES]
+        self.env.cr.execute(f"""
+            UPDATE dt_client_company client
+               SET {', '.join(f'{column} = rank.{column}' for column in columns)}
+              FROM unnest(%s::int[], {', '.join(['%s::int[]'] * len(columns))})
+                   AS rank(client_id, {', '.join(columns)})
+             WHERE client.id = rank.client_id
+        """, [client_ids, *(ranks[category] for category in BENCHMARK_CATEGORIES)])
+        self.env['dt.client.company'].invalidate_model(columns)
+        _logger.info("Refreshed the peer ranks of %d clients", len(client_ids))
+
+    @api.model
+    def _percentile_rank(self, boundaries, score):
+        """Return the percentile rank (0-100) of ``score`` among the peers of ``boundaries``.
+
+        Ties with a boundary count for half, so a group where every peer has
+        the same score ranks them all at the median.
+        """
+        if not boundaries:
+            return 0
+        below = bisect.bisect_left(boundaries, score)
+        below_or_equal = bisect.bisect_right(boundaries, score)
+        return round((below + below_or_equal) * 50 / len(boundaries))
+
+    @api.model
+    def get_client_rank(self, client_id, score, category='total'):
+        """Return the percentile rank a score would have among the peers of a client"""
+        client = self.env['dt.client.company'].browse(client_id)
+        benchmark = self.sudo().search_fetch([
+            ('industry_type', '=', client.industry_type),
+            ('company_size', '=', client.company_size),
+            ('category', '=', category),
+        ], ['boundaries'], limit=1)
+        return self._percentile_rank(tuple(benchmark.boundaries or ()), score)
@@ -0,0 +1,113 @@
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+from odoo.tools.sql import create_index
+
+SCORE_FIELDS = ('technology_score', 'process_score', 'people_score', 'culture_score', 'total_score')
+TREND_DIMENSIONS = {
+    'client': 'client_id',
+    'industry': 'industry_type',
+    'size': 'company_size',
+}
+TREND_PERIODS = ('day', 'week', 'month', 'quarter', 'year')
+
+
+class MaturitySnapshot(models.Model):
+    """Scores of a client at the completion of one of its assessments.
+
+    Rows are appended when an assessment is completed and never updated: the
+    client's industry and size are copied at that time, so the trend queries
+    read this narrow table alone instead of joining assessments, lines and
+    clients.
+    """
+    _name = 'dt.maturity.snapshot'
+    _description = 'Maturity Score Snapshot'
+    _order = 'snapshot_date desc, id desc'
+    _log_access = False
+
+    client_id = fields.Many2one('dt.client.company', string='Client', required=True, readonly=True,
+                                ondelete='cascade')
+    assessment_id = fields.Many2one('dt.assessment', string='Assessment', required=True, readonly=True,
+                                    ondelete='cascade')
+    snapshot_date = fields.Date(string='Date', required=True, readonly=True)
+    industry_type = fields.Selection(
+        selection=lambda self: self.env['dt.client.company']._fields['industry_type'].selection,
+        string='Industry', readonly=True)
+    company_size = fields.Selection(
+        selection=lambda self: self.env['dt.client.company']._fields['company_size'].selection,
+        string='Company Size', readonly=True)
+    technology_score = fields.Float(string='Technology Score', readonly=True, aggregator='avg')
+    process_score = fields.Float(string='Process Score', readonly=True, aggregator='avg')
+    people_score = fields.Float(string='People & Skills Score', readonly=True, aggregator='avg')
+    culture_score = fields.Float(string='Culture Score', readonly=True, aggregator='avg')
+    total_score = fields.Float(string='Total Score', readonly=True, aggregator='avg')
+
+    _sql_constraints = [
+        ('assessment_unique', 'unique(assessment_id)', 'An assessment has a single snapshot.'),
+    ]
+
+    def init(self):
+        create_index(self.env.cr, 'dt_maturity_snapshot_client_date_idx', self._table, ['client_id', 'snapshot_date'])
+        self.env.cr.execute("SELECT 1 FROM dt_maturity_snapshot LIMIT 1")
+        if not self.env.cr.fetchone():
+            self._append()
+
+    def write(self, vals):
+        raise UserError("Maturity snapshots cannot be modified.")
+
+    @api.model
+    def _append(self, assessment_ids=None):
+        """Append the snapshots of the given completed assessments (all when None) with one query"""
+        self.env['dt.assessment'].flush_model(['client_id', 'state', 'completion_date', 'assessment_date',
+                                               *SCORE_FIELDS])
+        self.env['dt.client.company'].flush_model(['industry_type', 'company_size'])
+        self.env.cr.execute("""
+            INSERT INTO dt_maturity_snapshot (client_id, assessment_id, snapshot_date, industry_type, company_size,
+                                              technology_score, process_score, people_score, culture_score,
+                                              total_score)
+                 SELECT assessment.client_id, assessment.id,
+                        COALESCE(assessment.completion_date, assessment.assessment_date),
+                        client.industry_type, client.company_size,
+                        assessment.technology_score, assessment.process_score, assessment.people_score,
+                        assessment.culture_score, assessment.total_score
+                   FROM dt_assessment assessment
+                   JOIN dt_client_company client ON client.id = assessment.client_id
+                  WHERE assessment.state = 'completed'
+                    AND (%(all)s OR assessment.id = ANY(%(ids)s))
+            ON CONFLICT (assessment_id) DO NOTHING
+        """, {'all': assessment_ids is None, 'ids': list(assessment_ids or [])})
+        self.invalidate_model()
+
+    @api.model
+    def get_trend(self, dimension='client', period='month', date_from=None, date_to=None, keys=None):
+        """Return the average scores of each client, industry or company size per period.
+
+        :param dimension: ``client``, ``industry`` or ``size``
+        :param period: ``day``, ``week``, ``month``, ``quarter`` or ``year``
+        :param keys: restrict the series to these client ids, industries or sizes
+        :return: ``{key: [{'period': date, 'count': int, 'technology_score': float, ...}, ...]}``
+            with the periods of each series in ascending order
+        """
+        if dimension not in TREND_DIMENSIONS:
+            raise UserError(f"Unknown trend dimension {dimension!r}.")
+        if period not in TREND_PERIODS:
+            raise UserError(f"Unknown trend period {period!r}.")
+        group_field = TREND_DIMENSIONS[dimension]
+        domain = []
+        if date_from:
+            domain.append(('snapshot_date', '>=', date_from))
+        if date_to:
+            domain.append(('snapshot_date', '<=', date_to))
+        if keys is not None:
+            domain.append((group_field, 'in', list(keys)))
+        groups = self._read_group(
+            domain,
+            groupby=[group_field, f'snapshot_date:{period}'],
+            aggregates=['__count', *(f'{fname}:avg' for fname in SCORE_FIELDS)],
+            order=f'{group_field}, snapshot_date:{period}',
+        )
+        series = {}
+        for key, period_start, count, *scores in groups:
+            if dimension == 'client':
+                key = key.id
+            series.setdefault(key, []).append(dict(zip(SCORE_FIELDS, scores), period=period_start, count=count))
+        return series
@@ -0,0 +1,175 @@
+import logging
+from collections import defaultdict
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+DIGEST_MAIL_SERVER_PARAM = 'digital_transformation_accelerator.digest_mail_server_id'
+DIGEST_TEMPLATE = 'digital_transformation_accelerator.notification_digest_email'
+
+
+class NotificationEvent(models.Model):
+    """State change waiting to be mailed to the followers of the record in their next digest"""
+    _name = 'dt.notification.event'
+    _description = 'Notification Digest Event'
+    _order = 'id'
+    _log_access = False
+
+    res_model = fields.Char(string='Model', required=True, readonly=True)
+    res_id = fields.Many2oneReference(string='Record', model_field='res_model', required=True, readonly=True)
+    field_name = fields.Char(string='Field', required=True, readonly=True)
+    old_value = fields.Char(string='Old Value', readonly=True)
+    new_value = fields.Char(string='New Value', readonly=True)
+    event_date = fields.Datetime(string='Date', required=True, readonly=True, default=fields.Datetime.now)
+    partner_id = fields.Many2one('res.partner', string='Recipient', readonly=True, ondelete='cascade',
+                                 help="Only mail the change to this partner, instead of the followers of the record")
+
+    @api.model
+    def _queue(self, records, field_name, old_values):
+        """Queue the changes of ``field_name`` on ``records`` given their ``{id: value}`` before the write"""
+        vals_list = [{
+            'res_model': records._name,
+            'res_id': record.id,
+            'field_name': field_name,
+            'old_value': old_values.get(record.id) or False,
+            'new_value': record[field_name] or False,
+        } for record in records if old_values.get(record.id) != record[field_name]]
+        if vals_list:
+            self.sudo().create(vals_list)
+
+    @api.model
+    def _cron_send_digests(self, batch_size=5000):
+        """Mail every follower a digest of the changes queued before the run, batch by batch.
+
+        Each batch claims up to ``batch_size`` events (removed from the queue),
+        mails each recipient one digest of them and is committed, so memory
+        and transaction length stay bounded whatever the backlog. The changes
+        of one record are coalesced into its first and last value. A digest
+        that cannot be prepared does not fail the batch: its changes are
+        queued again for that recipient alone.
+        """
+        cr = self.env.cr
+        # the events queued while the run goes on are left to the next run
+        cr.execute("SELECT MAX(id) FROM dt_notification_event")
+        last_id = cr.fetchone()[0]
+        while last_id:
+            cr.execute("""
+                DELETE FROM dt_notification_event
+                 WHERE id IN (SELECT id
+                                FROM dt_notification_event
+                               WHERE id <= %s
+                            ORDER BY id
+                               LIMIT %s
+                                 FOR UPDATE SKIP LOCKED)
+             RETURNING id, res_model, res_id, field_name, old_value, new_value, event_date, partner_id
+            """, [last_id, batch_size])
+            events = cr.fetchall()
+            if not events:
+                break
+            mails = self._prepare_digests(sorted(events))
+            mails.send()
+            cr.commit()
+            _logger.info("Sent %d notification digests for %d events", len(mails), len(events))
+
+    @api.model
+    def _prepare_digests(self, events):
+        """Create the digest mails of the given event rows, one per recipient, in the recipient's language.
+
+        Rows are ``(id, res_model, res_id, field_name, old_value, new_value,
+        event_date, partner_id)``, in id order; rows with a ``partner_id`` are
+        only mailed to that partner.
+        """
+        changes = {}
+        for _event_id, res_model, res_id, field_name, old_value, new_value, event_date, partner_id in events:
+            key = (res_model, res_id, field_name, partner_id)
+            if key in changes:
+                changes[key].update(new_value=new_value, date=event_date)
+            else:
+                changes[key] = {'old_value': old_value, 'new_value': new_value, 'date': event_date}
+        changes = {key: change for key, change in changes.items() if change['old_value'] != change['new_value']}
+
+        records_by_model = defaultdict(set)
+        for res_model, res_id, _field_name, _partner_id in changes:
+            records_by_model[res_model].add(res_id)
+        followers = defaultdict(set)
+        names = {}
+        for res_model, res_ids in records_by_model.items():
+            records = self.env[res_model].sudo().browse(list(res_ids)).exists()
+            names.update(((res_model, record.id), record.display_name) for record in records)
+            for follower in self.env['mail.followers'].sudo().search_fetch(
+                    [('res_model', '=', res_model), ('res_id', 'in', records.ids)], ['res_id', 'partner_id']):
+                followers[res_model, follower.res_id].add(follower.partner_id)
+
+        Partner = self.env['res.partner'].sudo()
+        digests = defaultdict(list)
+        for key in changes:
+            res_model, res_id, _field_name, partner_id = key
+            if (res_model, res_id) in names:
+                for partner in Partner.browse(partner_id) if partner_id else followers[res_model, res_id]:
+                    digests[partner].append(key)
+
+        base_url = self.get_base_url()
+        mail_server_id = int(self.env['ir.config_parameter'].sudo().get_param(DIGEST_MAIL_SERVER_PARAM, 0)) or False
+        email_from = self.env.company.email_formatted or self.env.user.email_formatted
+        labels = {}
+
+        def label(env, res_model, field_name):
+            """Return (model label, field label, value labels) in the language of ``env``, once per language"""
+            cache_key = (env.lang, res_model, field_name)
+            if cache_key not in labels:
+                field = env[res_model]._fields[field_name]
+                values = dict(field._description_selection(env)) if field.type == 'selection' else {}
+                labels[cache_key] = (env['ir.model']._get(res_model).name, field._description_string(env), values)
+            return labels[cache_key]
+
+        mail_vals_list = []
+        requeued_vals_list = []
+        for partner, keys in digests.items():
+            if not partner.exists() or not partner.email:
+                continue
+            try:
+                with self.env.cr.savepoint():
+                    mail_vals_list.append(self._prepare_digest(partner, [
+                        dict(changes[key], res_model=key[0], res_id=key[1], field_name=key[2]) for key in keys
+                    ], names, label, base_url, email_from, mail_server_id))
+            except Exception:
+                _logger.exception("Could not prepare the notification digest of partner %s, queued again", partner.id)
+                requeued_vals_list += [{
+                    'res_model': res_model,
+                    'res_id': res_id,
+                    'field_name': field_name,
+                    'old_value': changes[res_model, res_id, field_name, partner_id]['old_value'],
+                    'new_value': changes[res_model, res_id, field_name, partner_id]['new_value'],
+                    'event_date': changes[res_model, res_id, field_name, partner_id]['date'],
+                    'partner_id': partner.id,
+                } for res_model, res_id, field_name, partner_id in keys]
+        if requeued_vals_list:
+            self.sudo().create(requeued_vals_list)
+        return self.env['mail.mail'].sudo().create(mail_vals_list)
+
+    @api.model
+    def _prepare_digest(self, partner, partner_changes, names, label, base_url, email_from, mail_server_id):
+        """Return the values of the digest mail of ``partner``, rendered in the partner's language"""
+        env = self.with_context(lang=partner.lang).env
+        lines = []
+        for change in partner_changes:
+            res_model, res_id = change['res_model'], change['res_id']
+            model_label, field_label, values = label(env, res_model, change['field_name'])
+            lines.append({
+                'model': model_label,
+                'name': names[res_model, res_id],
+                'url': f'{base_url}/mail/view?model={res_model}&res_id={res_id}',
+                'field': field_label,
+                'old_value': values.get(change['old_value'], change['old_value']),
+                'new_value': values.get(change['new_value'], change['new_value']),
+                'date': change['date'],
+            })
+        return {
+            'subject': env._("%(count)s updates on your digital transformation records", count=len(lines)),
+            'email_from': email_from,
+            'recipient_ids': [(4, partner.id)],
+            'body_html': env['ir.qweb']._render(DIGEST_TEMPLATE, {'partner': partner, 'lines': lines}),
+            'mail_server_id': mail_server_id,
+            'auto_delete': True,
+        }
@@ -0,0 +1,122 @@
+import functools
+import logging
+import time
+from datetime import timedelta
+
+from odoo import models, fields, api
+from odoo.tools import str2bool
+
+_logger = logging.getLogger(__name__)
+
+PERF_PARAM = 'digital_transformation_accelerator.perf_instrumentation'
+PERF_CONTEXT_KEY = 'dt_perf_instrumentation'
+SAMPLES_KEY = 'dt.perf.samples'
+
+
+def _instrumentation_enabled(env):
+    """Instrumentation is enabled by the context key, else by the system parameter"""
+    if PERF_CONTEXT_KEY in env.context:
+        return bool(env.context[PERF_CONTEXT_KEY])
+    return str2bool(env['ir.config_parameter'].sudo().get_param(PERF_PARAM, 'False'))
+
+
+def instrumented(method):
+    """Record query count, records processed and elapsed time of a compute or action method.
+
+    Measures are inclusive: a compute triggered from an action counts in both.
+    Nothing is measured unless instrumentation is enabled.
+    """
+    method_name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not _instrumentation_enabled(self.env):
+            return method(self, *args, **kwargs)
+        cr = self.env.cr
+        queries = cr.sql_log_count
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.env['dt.perf.sample']._accumulate(
+                self._name, method_name, len(self), cr.sql_log_count - queries, time.perf_counter() - start)
+
+    return wrapper
+
+
+class PerfSample(models.Model):
+    """Aggregated performance sample of a dt.* method within one request"""
+    _name = 'dt.perf.sample'
+    _description = 'Digital Transformation Performance Sample'
+    _order = 'sample_date desc, duration_ms desc'
+
+    name = fields.Char(string='Method', required=True)
+    model = fields.Char(string='Model', required=True, index=True)
+    method = fields.Char(string='Method Name', required=True)
+    kind = fields.Selection([
+        ('compute', 'Compute'),
+        ('action', 'Action'),
+        ('other', 'Other'),
+    ], string='Kind', required=True, default='other')
+    sample_date = fields.Datetime(string='Sampled On', default=fields.Datetime.now, required=True, index=True)
+    calls = fields.Integer(string='Calls')
+    records = fields.Integer(string='Records Processed')
+    query_count = fields.Integer(string='SQL Queries')
+    duration_ms = fields.Float(string='Elapsed (ms)', digits=(16, 2))
+    queries_per_record = fields.Float(string='Queries / Record', compute='_compute_queries_per_record',
+                                      store=True, aggregator='avg')
+
+    @api.depends('query_count', 'records')
+    def _compute_queries_per_record(self):
+        for record in self:
+            record.queries_per_record = record.query_count / record.records if record.records else 0.0
+
+    @api.model
+    def _accumulate(self, model_name, method_name, records, query_count, duration):
+        """Add a measure to the current request's summary, flushed after the transaction ends"""
+        callbacks = self.env.cr.postcommit
+        samples = callbacks.data.get(SAMPLES_KEY)
+        if samples is None:
+            samples = callbacks.data[SAMPLES_KEY] = {}
+            callbacks.add(functools.partial(self._flush_samples, self.env.cr.dbname, samples))
+        sample = samples.setdefault((model_name, method_name), [0, 0, 0, 0.0])
+        sample[0] += 1
+        sample[1] += records
+        sample[2] += query_count
+        sample[3] += duration
+
+    def _flush_samples(self, dbname, samples):
+        """Log the request summary and store it, using a separate cursor.
+
+        Runs after commit so that sampling never extends the user's transaction,
+        and works for read-only requests as well.
+        """
+        if not samples:
+            return
+        ranking = sorted(samples.items(), key=lambda item: item[1][3], reverse=True)
+        _logger.info("dt.* performance summary:\n%s", '\n'.join(
+            "  %s.%s: %d calls, %d records, %d queries, %.1f ms" % (
+                model_name, method_name, calls, records, query_count, duration * 1000)
+            for (model_name, method_name), (calls, records, query_count, duration) in ranking))
+        try:
+            with self.pool.cursor() as cr:
+                env = api.Environment(cr, self.env.uid, {})
+                env['dt.perf.sample'].sudo().create([{
+                    'name': f'{model_name}.{method_name}',
+                    'model': model_name,
+                    'method': method_name,
+                    'kind': ('compute' if method_name.startswith('_compute')
+                             else 'action' if method_name.startswith('action_') else 'other'),
+                    'calls': calls,
+                    'records': records,
+                    'query_count': query_count,
+                    'duration_ms': duration * 1000,
+                } for (model_name, method_name), (calls, records, query_count, duration) in ranking])
+        except Exception:
+            _logger.exception("Could not store dt.* performance samples")
+
+    @api.autovacuum
+    def _gc_old_samples(self):
+        """Drop samples older than 30 days"""
+        limit = fields.Datetime.now() - timedelta(days=30)
+        self.search([('sample_date', '<', limit)]).unlink()
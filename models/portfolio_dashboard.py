@@ -0,0 +1,166 @@
+import json
+import logging
+
+from odoo import models, fields, api
+from odoo.tools.sql import create_index
+
+_logger = logging.getLogger(__name__)
+
+# metric: (source tables, INSERT ... SELECT rebuilding the metric rows)
+METRIC_QUERIES = {
+    # the maturity level is a stored compute of the client, moved by assessment changes
+    'maturity': (('dt_client_company', 'dt_assessment'), """
+        INSERT INTO dt_portfolio_dashboard (metric, industry_type, maturity_level, client_count, refreshed_at)
+             SELECT 'maturity', industry_type, maturity_level, COUNT(*), %(now)s
+               FROM dt_client_company
+           GROUP BY industry_type, maturity_level
+    """),
+    'score_trend': (('dt_assessment',), """
+        INSERT INTO dt_portfolio_dashboard (metric, period_start, assessment_count, avg_score, refreshed_at)
+             SELECT 'score_trend', date_trunc('quarter', assessment_date)::date, COUNT(*), AVG(total_score), %(now)s
+               FROM dt_assessment
+              WHERE state = 'completed'
+           GROUP BY date_trunc('quarter', assessment_date)
+    """),
+    'budget': (('dt_project',), """
+        INSERT INTO dt_portfolio_dashboard (metric, project_state, project_count, estimated_budget,
+                                            actual_budget, budget_variance, refreshed_at)
+             SELECT 'budget', state, COUNT(*),
+                    SUM(COALESCE(estimated_budget, 0)),
+                    SUM(COALESCE(actual_budget, 0)),
+                    SUM(COALESCE(actual_budget, 0) - COALESCE(estimated_budget, 0)),
+                    %(now)s
+               FROM dt_project
+           GROUP BY state
+    """),
+}
+
+
+class PortfolioDashboard(models.Model):
+    """Materialized portfolio aggregates over clients, assessments and projects.
+
+    The rows are rebuilt by :meth:`refresh` (on demand or from the cron), so
+    opening the dashboard reads a handful of pre-aggregated rows whatever the
+    size of the portfolio.
+    """
+    _name = 'dt.portfolio.dashboard'
+    _description = 'Digital Transformation Portfolio Dashboard'
+    _order = 'metric, period_start, industry_type, maturity_level, project_state'
+    _log_access = False
+
+    metric = fields.Selection([
+        ('maturity', 'Maturity Distribution'),
+        ('score_trend', 'Score Trend'),
+        ('budget', 'Budget Variance'),
+    ], string='Metric', required=True, readonly=True, index=True)
+
+    # Dimensions
+    industry_type = fields.Selection(
+        selection=lambda self: self.env['dt.client.company']._fields['industry_type'].selection,
+        string='Industry', readonly=True)
+    maturity_level = fields.Selection(
+        selection=lambda self: self.env['dt.client.company']._fields['maturity_level'].selection,
+        string='Maturity Level', readonly=True)
+    period_start = fields.Date(string='Quarter', readonly=True)
+    project_state = fields.Selection(
+        selection=lambda self: self.env['dt.project']._fields['state'].selection,
+        string='Project Status', readonly=True)
+
+    # Measures
+    client_count = fields.Integer(string='Clients', readonly=True)
+    assessment_count = fields.Integer(string='Completed Assessments', readonly=True)
+    avg_score = fields.Float(string='Average Score', readonly=True, aggregator='avg')
+    project_count = fields.Integer(string='Projects', readonly=True)
+    estimated_budget = fields.Float(string='Estimated Budget', readonly=True)
+    actual_budget = fields.Float(string='Actual Budget', readonly=True)
+    budget_variance = fields.Float(string='Budget Variance', readonly=True)
+    refreshed_at = fields.Datetime(string='Refreshed On', readonly=True)
+
+    def init(self):
+        # watermarks: latest write date of each source table
+        for table in ('dt_client_company', 'dt_assessment', 'dt_project'):
+            create_index(self.env.cr, f'{table}_write_date_idx', table, ['write_date'])
+
+    @api.model
+    def _source_watermark(self, table):
+        """Change marker of a source table, read from its indexes.
+
+        The row count moves on inserts and deletes (an index-only scan of the
+        primary key), the highest id on inserts and the latest write date on
+        updates; all three are transactional.
+        """
+        self.env.cr.execute(f"""
+            SELECT (SELECT COUNT(*) FROM {table}),
+                   (SELECT MAX(id) FROM {table}),
+                   (SELECT MAX(write_date) FROM {table})
+        """)
+        count, max_id, last_write = self.env.cr.fetchone()
+        return [count, max_id, last_write and last_write.isoformat()]
+
+    @api.model
+    def refresh(self, incremental=False):
+        """Rebuild the dashboard rows and return the refreshed metrics.
+
+        With ``incremental``, only the metrics whose source tables changed since
+        the previous refresh are rebuilt (inserts, updates and deletes all move
+        the watermark).
+        """
+        self.env.flush_all()
+        watermarks = self.env['dt.portfolio.dashboard.watermark']._get_watermarks()
+        source_watermarks = {}
+        refreshed = []
+        for metric, (tables, query) in METRIC_QUERIES.items():
+            for table in tables:
+                if table not in source_watermarks:
+                    source_watermarks[table] = self._source_watermark(table)
+            watermark = [source_watermarks[table] for table in tables]
+            if incremental and watermarks.get(metric) == watermark:
+                continue
+            self.env.cr.execute("DELETE FROM dt_portfolio_dashboard WHERE metric = %s", [metric])
+            self.env.cr.execute(query, {'now': self.env.cr.now()})
+            self.env['dt.portfolio.dashboard.watermark']._set_watermark(metric, watermark)
+            refreshed.append(metric)
+        if refreshed:
+            self.invalidate_model()
+            _logger.info("Portfolio dashboard refreshed: %s", ', '.join(refreshed))
+        return refreshed
+
+    @api.model
+    def action_refresh_dashboard(self):
+        self.refresh()
+        return {'type': 'ir.actions.client', 'tag': 'reload'}
+
+    @api.model
+    def _cron_refresh_dashboard(self):
+        self.refresh(incremental=True)
+
+
+class PortfolioDashboardWatermark(models.Model):
+    """Source watermarks of a dashboard metric as of its last refresh"""
+    _name = 'dt.portfolio.dashboard.watermark'
+    _description = 'Portfolio Dashboard Watermark'
+    _log_access = False
+
+    metric = fields.Selection(
+        selection=lambda self: self.env['dt.portfolio.dashboard']._fields['metric'].selection,
+        string='Metric', required=True, readonly=True)
+    watermark = fields.Json(string='Watermark', readonly=True)
+
+    _sql_constraints = [
+        ('metric_unique', 'unique(metric)', 'A metric has a single watermark.'),
+    ]
+
+    @api.model
+    def _get_watermarks(self):
+        """Return ``{metric: watermark}`` of the metrics refreshed so far"""
+        self.env.cr.execute("SELECT metric, watermark FROM dt_portfolio_dashboard_watermark")
+        return dict(self.env.cr.fetchall())
+
+    @api.model
+    def _set_watermark(self, metric, watermark):
+        self.env.cr.execute("""
+            INSERT INTO dt_portfolio_dashboard_watermark (metric, watermark)
+                 VALUES (%s, %s)
+            ON CONFLICT (metric) DO UPDATE SET watermark = EXCLUDED.watermark
+        """, [metric, json.dumps(watermark)])
+        self.invalidate_model()
@@ -0,0 +1,95 @@
+from odoo import models, fields, api
+
+from .transformation_project import ENGAGEMENT_TYPES
+
+
+class ProjectBlueprint(models.Model):
+    """Reusable plan of phases, tasks and milestones instantiated on projects"""
+    _name = 'dt.project.blueprint'
+    _description = 'Project Phase Blueprint'
+    _order = 'sequence, id'
+
+    name = fields.Char(string='Blueprint', required=True)
+    active = fields.Boolean(string='Active', default=True)
+    sequence = fields.Integer(string='Sequence', default=10)
+    description = fields.Text(string='Description')
+    industry_type = fields.Selection(
+        selection=lambda self: self.env['dt.client.company']._fields['industry_type'].selection,
+        string='Industry', help="Leave empty to use the blueprint for every industry")
+    engagement_type = fields.Selection(ENGAGEMENT_TYPES, string='Engagement Type',
+                                       help="Leave empty to use the blueprint for every engagement type")
+    phase_ids = fields.One2many('dt.project.blueprint.phase', 'blueprint_id', string='Phases', copy=True)
+    milestone_ids = fields.One2many('dt.project.blueprint.milestone', 'blueprint_id', string='Milestones',
+                                    copy=True)
+    total_weight = fields.Integer(string='Total Weight (%)', compute='_compute_total_weight')
+
+    @api.depends('phase_ids.weight')
+    def _compute_total_weight(self):
+        for record in self:
+            record.total_weight = sum(record.phase_ids.mapped('weight'))
+
+    @api.model
+    def _match_projects(self, projects):
+        """Return {project_id: blueprint} of the most specific active blueprint for each project.
+
+        A blueprint applies when its industry and engagement type are empty or
+        equal to the project's; the ones setting both win over the ones setting
+        one, then the lowest sequence wins.
+        """
+        blueprints = self.search([])
+        matches = {}
+        for project in projects:
+            industry = project.client_id.industry_type
+            candidates = [
+                blueprint for blueprint in blueprints
+                if blueprint.industry_type in (False, industry)
+                and blueprint.engagement_type in (False, project.engagement_type)
+            ]
+            if candidates:
+                matches[project.id] = max(candidates, key=lambda blueprint: (
+                    bool(blueprint.industry_type) + bool(blueprint.engagement_type), -blueprint.sequence))
+        return matches
+
+
+class ProjectBlueprintPhase(models.Model):
+    """Phase of a project blueprint"""
+    _name = 'dt.project.blueprint.phase'
+    _description = 'Project Blueprint Phase'
+    _order = 'blueprint_id, sequence, id'
+
+    blueprint_id = fields.Many2one('dt.project.blueprint', string='Blueprint', required=True, ondelete='cascade',
+                                   index=True)
+    name = fields.Char(string='Phase Name', required=True)
+    description = fields.Text(string='Description')
+    sequence = fields.Integer(string='Sequence', default=10)
+    weight = fields.Integer(string='Weight (%)', default=0)
+    duration_weeks = fields.Integer(string='Duration (Weeks)', default=4)
+    task_ids = fields.One2many('dt.project.blueprint.task', 'phase_id', string='Tasks', copy=True)
+
+
+class ProjectBlueprintTask(models.Model):
+    """Task of a project blueprint phase"""
+    _name = 'dt.project.blueprint.task'
+    _description = 'Project Blueprint Task'
+    _order = 'phase_id, sequence, id'
+
+    phase_id = fields.Many2one('dt.project.blueprint.phase', string='Phase', required=True, ondelete='cascade',
+                               index=True)
+    name = fields.Char(string='Task', required=True)
+    description = fields.Text(string='Description')
+    sequence = fields.Integer(string='Sequence', default=10)
+
+
+class ProjectBlueprintMilestone(models.Model):
+    """Milestone of a project blueprint"""
+    _name = 'dt.project.blueprint.milestone'
+    _description = 'Project Blueprint Milestone'
+    _order = 'blueprint_id, offset_weeks, id'
+
+    blueprint_id = fields.Many2one('dt.project.blueprint', string='Blueprint', required=True, ondelete='cascade',
+                                   index=True)
+    name = fields.Char(string='Milestone', required=True)
+    description = fields.Text(string='Description')
+    offset_weeks = fields.Integer(string='Weeks After Start', default=0)
+    importance = fields.Selection([('low', 'Low'), ('medium', 'Medium'), ('high', 'High')], string='Importance',
+                                  default='medium')
@@ -0,0 +1,171 @@
+import json
+import logging
+
+from odoo import models, api
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+
+class QueryPlanCheck(models.AbstractModel):
+    """Query plan regression check for the module's hot query paths"""
+    _name = 'dt.query.plan'
+    _description = 'Digital Transformation Query Plan Check'
+
+    # name: (query, parameters) of the statements issued by the dt.* computes and views
+    HOT_QUERIES = {
+        'latest_assessment_per_client': ("""
+            SELECT DISTINCT ON (client_id) client_id, id
+              FROM dt_assessment
+             WHERE client_id = ANY(%(client_ids)s)
+          ORDER BY client_id, assessment_date DESC, id DESC
+        """, ('client_ids',)),
+        'latest_project_per_client': ("""
+            SELECT DISTINCT ON (client_id) client_id, id
+              FROM dt_project
+             WHERE client_id = ANY(%(client_ids)s)
+          ORDER BY client_id, start_date DESC NULLS LAST, id DESC
+        """, ('client_ids',)),
+        'assessment_list': ("""
+            SELECT id FROM dt_assessment ORDER BY assessment_date DESC LIMIT 80
+        """, ()),
+        'assessments_by_state': ("""
+            SELECT id FROM dt_assessment WHERE state = 'in_progress'
+        """, ()),
+        'assessment_questionnaire': ("""
+            SELECT id FROM dt_assessment_line WHERE assessment_id = %(assessment_id)s
+        """, ('assessment_id',)),
+        'assessment_category_lines': ("""
+            SELECT SUM(score), COUNT(*)
+              FROM dt_assessment_line
+             WHERE assessment_id = %(assessment_id)s AND category = 'technology'
+        """, ('assessment_id',)),
+        'projects_by_manager': ("""
+            SELECT project_manager_id, COUNT(*)
+              FROM dt_project
+             WHERE project_manager_id = ANY(%(consultant_ids)s)
+          GROUP BY project_manager_id
+        """, ('consultant_ids',)),
+        'project_list': ("""
+            SELECT id FROM dt_project ORDER BY create_date DESC LIMIT 80
+        """, ()),
+        'phase_rollup': ("""
+            SELECT project_id, SUM(progress * weight), SUM(weight)
+              FROM dt_project_phase
+             WHERE project_id = ANY(%(project_ids)s)
+          GROUP BY project_id
+        """, ('project_ids',)),
+        'task_rollup': ("""
+            SELECT phase_id, state, COUNT(*)
+              FROM dt_project_task
+             WHERE phase_id = ANY(%(phase_ids)s)
+          GROUP BY phase_id, state
+        """, ('phase_ids',)),
+        'consultant_load_window': ("""
+            SELECT consultant_id, MAX(load)
+              FROM dt_consultant_load
+             WHERE consultant_id = ANY(%(consultant_ids)s)
+               AND week_start BETWEEN CURRENT_DATE AND CURRENT_DATE + 84
+          GROUP BY consultant_id
+        """, ('consultant_ids',)),
+        'overdue_milestones': ("""
+            SELECT id
+              FROM dt_project_milestone
+             WHERE achieved IS NOT TRUE
+               AND state IS DISTINCT FROM 'completed'
+               AND COALESCE(target_date, due_date) < CURRENT_DATE
+               AND COALESCE(target_date, due_date) > CURRENT_DATE - 7
+        """, ()),
+        'overdue_deliverables': ("""
+            SELECT id
+              FROM dt_project_deliverable
+             WHERE delivered IS NOT TRUE
+               AND state IS DISTINCT FROM 'completed'
+               AND due_date < CURRENT_DATE
+               AND due_date > CURRENT_DATE - 7
+        """, ()),
+        'team_membership': ("""
+            SELECT consultant_id, COUNT(*)
+              FROM dt_project_team_rel
+             WHERE consultant_id = ANY(%(consultant_ids)s)
+          GROUP BY consultant_id
+        """, ('consultant_ids',)),
+    }
+
+    @api.model
+    def _sample_parameters(self):
+        """Pick existing ids from the seeded data to plan the hot queries with"""
+        cr = self.env.cr
+        params = {}
+        for key, table in (('client_ids', 'dt_client_company'), ('consultant_ids', 'dt_consultant'),
+                           ('project_ids', 'dt_project'), ('phase_ids', 'dt_project_phase')):
+            cr.execute(f"SELECT id FROM {table} ORDER BY id DESC LIMIT 10")
+            params[key] = [row[0] for row in cr.fetchall()] or [0]
+        cr.execute("SELECT MAX(id) FROM dt_assessment")
+        params['assessment_id'] = cr.fetchone()[0] or 0
+        return params
+
+    @api.model
+    def _seq_scans(self, node):
+        """Return the relations scanned sequentially anywhere in an EXPLAIN plan node"""
+        scans = []
+        if node.get('Node Type') == 'Seq Scan':
+            scans.append(node.get('Relation Name'))
+        for child in node.get('Plans', []):
+            scans += self._seq_scans(child)
+        return scans
+
+    @api.model
+    def _index_names(self, node):
+        """Return the indexes scanned anywhere in an EXPLAIN plan node"""
+        names = [node['Index Name']] if 'Index Name' in node else []
+        for child in node.get('Plans', []):
+            names += self._index_names(child)
+        return names
+
+    @api.model
+    def _explain_hot_queries(self, params=None):
+        """EXPLAIN every hot query with the current planner settings.
+
+        Returns ``{query_name: root plan node}``.
+        """
+        self.env.flush_all()
+        cr = self.env.cr
+        params = params or self._sample_parameters()
+        report = {}
+        for name, (query, keys) in self.HOT_QUERIES.items():
+            cr.execute(f"EXPLAIN (FORMAT JSON) {query}", {key: params[key] for key in keys})
+            plan = cr.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            report[name] = plan[0]['Plan']
+        return report
+
+    @api.model
+    def check_hot_query_plans(self, raise_on_seq_scan=True):
+        """EXPLAIN every hot query and report the ones that fall back to a sequential scan.
+
+        Sequential scans are disabled for the duration of the check so that the
+        planner picks an index whenever a usable one exists, which makes the
+        result independent of the amount of seeded data: this checks that the
+        indexes exist and are usable by the queries, which is also what
+        ``tests/test_query_plans.py`` asserts index by index. Returns ``{query_name: [relations
+        scanned sequentially]}`` and raises a UserError listing the offenders
+        when ``raise_on_seq_scan`` is set.
+        """
+        cr = self.env.cr
+        cr.execute("SHOW enable_seqscan")
+        enable_seqscan = cr.fetchone()[0]
+        try:
+            cr.execute("SET LOCAL enable_seqscan = off")
+            report = {name: self._seq_scans(plan) for name, plan in self._explain_hot_queries().items()}
+        finally:
+            cr.execute("SELECT set_config('enable_seqscan', %s, true)", [enable_seqscan])
+
+        offenders = {name: scans for name, scans in report.items() if scans}
+        for name, scans in offenders.items():
+            _logger.warning("Hot query %s uses a sequential scan on %s", name, ', '.join(scans))
+        if offenders and raise_on_seq_scan:
+            raise UserError("Hot queries falling back to a sequential scan:\n%s" % '\n'.join(
+                f"{name}: {', '.join(scans)}" for name, scans in offenders.items()))
+        return report
@@ -0,0 +1,109 @@
+from odoo import models, fields, api, tools
+from odoo.exceptions import ValidationError
+
+RULES_DIRTY_KEY = 'dt.recommendation.rule'
+
+
+class RecommendationRule(models.Model):
+    """Recommendation added to an assessment when a category score falls in a band"""
+    _name = 'dt.recommendation.rule'
+    _description = 'Assessment Recommendation Rule'
+    _order = 'sequence, id'
+
+    name = fields.Char(string='Rule', required=True)
+    active = fields.Boolean(string='Active', default=True)
+    sequence = fields.Integer(string='Sequence', default=10)
+    category = fields.Selection([
+        ('technology', 'Technology'),
+        ('process', 'Process'),
+        ('people', 'People & Skills'),
+        ('culture', 'Culture'),
+        ('total', 'Total Score'),
+    ], string='Category', required=True)
+    score_min = fields.Float(string='Score From', default=0.0, help="Lowest score of the band (included)")
+    score_max = fields.Float(string='Score Below', default=50.0, help="Upper bound of the band (excluded)")
+    industry_type = fields.Selection(
+        selection=lambda self: self.env['dt.client.company']._fields['industry_type'].selection,
+        string='Industry', help="Leave empty to apply the rule to every industry")
+    recommendation = fields.Html(string='Recommendation', required=True)
+
+    @api.constrains('score_min', 'score_max')
+    def _check_band(self):
+        for record in self:
+            if record.score_min >= record.score_max:
+                raise ValidationError("The lower bound of the score band must be below its upper bound.")
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        rules = super().create(vals_list)
+        self._rules_changed()
+        return rules
+
+    def write(self, vals):
+        res = super().write(vals)
+        self._rules_changed()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self._rules_changed()
+        return res
+
+    def _rules_changed(self):
+        """Mark the rules as changed by the current transaction and let the cron regenerate the
+        recommendations of completed assessments"""
+        self.env.cr.precommit.data[RULES_DIRTY_KEY] = True
+        cron = self.env.ref('digital_transformation_accelerator.ir_cron_regenerate_recommendations',
+                            raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+
+    @api.model
+    def _get_rules_revision(self):
+        """Return the fingerprint of the rule set (count and latest write date), moved by any change"""
+        self.flush_model()
+        self.env.cr.execute("SELECT COUNT(*), MAX(write_date) FROM dt_recommendation_rule")
+        count, last_write = self.env.cr.fetchone()
+        return f"{count}/{last_write and last_write.isoformat()}"
+
+    @api.model
+    def _get_compiled_rules(self):
+        """Return the compiled rules, from the ormcache when this transaction did not change them.
+
+        The cache is keyed on the rule set fingerprint, so a change committed by
+        any worker yields a new key without clearing the registry caches; a
+        transaction that changed the rules compiles its own copy.
+        """
+        if self.env.cr.precommit.data.get(RULES_DIRTY_KEY):
+            return self._compile_rules()
+        return self._compiled_rules_for_revision(self._get_rules_revision())
+
+    @tools.ormcache('revision')
+    def _compiled_rules_for_revision(self, revision):
+        return self._compile_rules()
+
+    @api.model
+    def _compile_rules(self):
+        """Compile the active rules into ``{industry: ((category, score_min, score_max, html), ...)}``.
+
+        Each industry entry holds the generic rules merged with the rules of
+        that industry in sequence order; the ``False`` entry holds the generic
+        rules only, for clients without an industry.
+        """
+        rules = self.sudo().search([])
+        industries = [False] + [key for key, _label in self._fields['industry_type'].selection]
+        return {
+            industry: tuple(
+                (rule.category, rule.score_min, rule.score_max, rule.recommendation)
+                for rule in rules if rule.industry_type in (False, industry)
+            )
+            for industry in industries
+        }
+
+    @api.model
+    def _recommend(self, compiled, industry, scores):
+        """Return the recommendations HTML of an assessment given its ``{category: score}``"""
+        return '\n'.join(
+            html for category, score_min, score_max, html in compiled.get(industry or False, compiled[False])
+            if score_min <= scores[category] < score_max
+        )
@@ -1,5 +1,34 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from markupsafe import Markup
+
 from odoo import models, fields, api
-from odoo.exceptions import ValidationError
+from odoo.exceptions import UserError, ValidationError
+from odoo.tools.sql import create_index
+
+from .perf_sample import instrumented
+
+_logger = logging.getLogger(__name__)
+
+OVERDUE_SCAN_PARAM = 'digital_transformation_accelerator.overdue_scan_date'
+# items listed per project in an overdue digest
+DIGEST_ITEM_LIMIT = 20
+# fields of the records booking consultants that move the weekly load matrix
+LOAD_FIELDS = {
+    'dt.project.phase': {'responsible_id', 'allocation_percentage', 'start_date', 'end_date', 'state',
+                         'project_id'},
+    'dt.project.task': {'assigned_to', 'allocation_percentage', 'state', 'phase_id'},
+}
+
+ENGAGEMENT_TYPES = [
+    ('erp', 'ERP Implementation'),
+    ('cloud', 'Cloud Migration'),
+    ('data', 'Data & Analytics'),
+    ('automation', 'Process Automation'),
+    ('custom', 'Custom Development'),
+]
 
 
 class DigitalTransformationProject(models.Model):
@@ -9,7 +38,7 @@ class DigitalTransformationProject(models.Model):
     _name = 'dt.project'
     _description = 'Digital Transformation Project'
     _order = 'create_date desc'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'dt.bulk.mixin']
 
     # Basic Info
     name = fields.Char(string='Project Name', required=True)
@@ -22,7 +51,7 @@ class DigitalTransformationProject(models.Model):
     )
 
     # Dates
-    start_date = fields.Date(string='Start Date')
+    start_date = fields.Date(string='Start Date', index=True)
     target_completion_date = fields.Date(string='Target Completion Date')
     actual_completion_date = fields.Date(string='Actual Completion Date')
 
@@ -38,7 +67,7 @@ class DigitalTransformationProject(models.Model):
         ('on_hold', 'On Hold'),
         ('completed', 'Completed'),
         ('cancelled', 'Cancelled')
-    ], string='Status', default='draft')
+    ], string='Status', default='draft', index=True)
 
     # Budget
     budget = fields.Float(string='Budget')
@@ -57,9 +86,13 @@ class DigitalTransformationProject(models.Model):
         string='Assigned Consultants'
     )
     assessment_id = fields.Many2one('dt.assessment', string='Assessment', domain="[('client_id','=',client_id)]")
+    engagement_type = fields.Selection(ENGAGEMENT_TYPES, string='Engagement Type')
+    blueprint_id = fields.Many2one('dt.project.blueprint', string='Phase Blueprint',
+                                   help="Blueprint used to generate the phases; matched on the client's industry "
+                                        "and the engagement type when empty")
 
     # New fields added to match views
-    project_manager_id = fields.Many2one('dt.consultant', string='Project Manager')
+    project_manager_id = fields.Many2one('dt.consultant', string='Project Manager', index=True)
     risk_level = fields.Char(string='Risk Level')
     duration_months = fields.Integer(string='Duration (Months)')
     currency_id = fields.Many2one('res.currency', string='Currency')
@@ -108,22 +141,61 @@ class DigitalTransformationProject(models.Model):
         store=True
     )
 
+    def init(self):
+        # latest project per client (DISTINCT ON in dt.client.company) and the client's project list
+        create_index(self.env.cr, 'dt_project_client_start_idx', self._table,
+                     ['client_id', 'start_date DESC NULLS LAST', 'id DESC'])
+        # default list order
+        create_index(self.env.cr, 'dt_project_create_date_idx', self._table, ['create_date DESC'])
+
     # ------------------ COMPUTES ------------------
 
-    @api.depends('phase_ids', 'phase_ids.progress')
+    @api.depends('phase_ids', 'phase_ids.progress', 'phase_ids.weight')
+    @instrumented
     def _compute_progress(self):
-        """Compute overall project progress as average of phase progress."""
+        """Compute overall project progress as the weighted average of phase progress.
+
+        Phases are aggregated for the whole recordset in one grouped query; projects
+        whose phases carry no weight fall back to the plain average.
+        """
+        rollup = {}
+        project_ids = self._origin.ids
+        if project_ids:
+            self.env['dt.project.phase'].flush_model(['project_id', 'progress', 'weight'])
+            self.env.cr.execute("""
+                SELECT project_id, SUM(progress * weight), SUM(weight), AVG(progress)
+                  FROM dt_project_phase
+                 WHERE project_id = ANY(%s)
+              GROUP BY project_id
+            """, [project_ids])
+            rollup = {
+                project_id: weighted / total_weight if total_weight else average
+                for project_id, weighted, total_weight, average in self.env.cr.fetchall()
+            }
         for record in self:
-            if record.phase_ids:
-                record.progress = sum(record.phase_ids.mapped('progress')) / len(record.phase_ids)
-            else:
-                record.progress = 0.0
+            record.progress = rollup.get(record._origin.id) or 0.0
 
     @api.depends('phase_ids')
+    @instrumented
     def _compute_phase_count(self):
         for record in self:
             record.phase_count = len(record.phase_ids)
 
+    # ------------------ CONSULTANT LOAD ------------------
+
+    def write(self, vals):
+        if 'state' not in vals:
+            return super().write(vals)
+        old_states = {project.id: project.state for project in self}
+        result = super().write(vals)
+        self.env['dt.consultant.load']._mark_dirty(self.phase_ids._booked_consultant_ids())
+        self.env['dt.notification.event']._queue(self, 'state', old_states)
+        return result
+
+    def unlink(self):
+        self.env['dt.consultant.load']._mark_dirty(self.phase_ids._booked_consultant_ids())
+        return super().unlink()
+
     # ------------------ CONSTRAINTS ------------------
 
     @api.constrains('start_date', 'target_completion_date')
@@ -135,44 +207,167 @@ class DigitalTransformationProject(models.Model):
 
     # ------------------ ACTIONS ------------------
 
+    @instrumented
     def action_start(self):
-        for record in self:
-            record.state = 'in_progress'
+        self._bulk_write({'state': 'in_progress'}, "Started")
 
+    @instrumented
     def action_complete(self):
-        for record in self:
-            record.state = 'completed'
-            record.actual_completion_date = fields.Date.today()
+        self._bulk_write({'state': 'completed', 'actual_completion_date': fields.Date.today()}, "Completed")
 
+    @instrumented
     def action_cancel(self):
-        for record in self:
-            record.state = 'cancelled'
+        self._bulk_write({'state': 'cancelled'}, "Cancelled")
 
+    @instrumented
     def action_reset_to_draft(self):
-        for record in self:
-            record.state = 'draft'
+        self._bulk_write({'state': 'draft'}, "Reset to draft")
 
     # ------------------ UTILITIES ------------------
 
-    def _generate_project_phases(self):
+    @instrumented
+    def action_generate_phases(self):
+        self._generate_project_phases()
+
+    def _generate_project_phases(self, blueprint=None):
+        """Instantiate the phases, tasks and milestones of a blueprint on every project of the recordset.
+
+        Each project uses ``blueprint``, else its own blueprint, else the best
+        match for its client's industry and its engagement type. New phases are
+        appended after the existing ones. Phases, tasks and milestones are each
+        created with one batched create for all projects, so the phase and
+        project progress rollups are computed once, when the creates are flushed.
         """
-        Utility to generate standard phases for a project
+        matches = {} if blueprint else self.env['dt.project.blueprint']._match_projects(self)
+        plans = {}
+        for project in self:
+            plans[project] = blueprint or project.blueprint_id or matches.get(project.id)
+            if not plans[project]:
+                raise UserError(f"No phase blueprint applies to project {project.name}.")
+
+        last_sequences = dict(self.env['dt.project.phase']._read_group(
+            [('project_id', 'in', self.ids)], ['project_id'], ['sequence:max']))
+        phase_vals, phase_sources, milestone_vals = [], [], []
+        for project, plan in plans.items():
+            sequence = last_sequences.get(project, 0)
+            start = project.start_date
+            for source in plan.phase_ids:
+                sequence += 1
+                end = start and start + timedelta(weeks=source.duration_weeks)
+                phase_vals.append({
+                    'name': source.name,
+                    'description': source.description,
+                    'project_id': project.id,
+                    'sequence': sequence,
+                    'weight': source.weight,
+                    'start_date': start,
+                    'end_date': end,
+                })
+                phase_sources.append(source)
+                start = end
+            milestone_vals += [{
+                'name': milestone.name,
+                'description': milestone.description,
+                'project_id': project.id,
+                'importance': milestone.importance,
+                'target_date': project.start_date and project.start_date + timedelta(weeks=milestone.offset_weeks),
+            } for milestone in plan.milestone_ids]
+
+        phases = self.env['dt.project.phase'].create(phase_vals)
+        self.env['dt.project.task'].create([{
+            'name': task.name,
+            'description': task.description,
+            'phase_id': phase.id,
+        } for phase, source in zip(phases, phase_sources) for task in source.task_ids])
+        self.env['dt.project.milestone'].create(milestone_vals)
+
+        unassigned = defaultdict(list)
+        for project, plan in plans.items():
+            if not project.blueprint_id:
+                unassigned[plan].append(project.id)
+        for plan, project_ids in unassigned.items():
+            self.browse(project_ids).write({'blueprint_id': plan.id})
+        return phases
+
+    # ------------------ OVERDUE ALERTS ------------------
+
+    @api.model
+    def _cron_notify_overdue(self):
+        """Mail each project manager one digest of the milestones and deliverables that became overdue.
+
+        Only the items whose deadline falls after the last scanned date and
+        before today are read, through the partial indexes on open items; the
+        scanned date is then moved to yesterday. The first run only reports
+        the items due yesterday, so the existing backlog is not mailed at once.
         """
-        standard_phases = [
-            ('Initiation', 10),
-            ('Planning', 20),
-            ('Design', 15),
-            ('Development', 35),
-            ('Testing', 15),
-            ('Deployment', 5)
-        ]
-        for phase_name, weight in standard_phases:
-            self.env['dt.project.phase'].create({
-                'name': phase_name,
-                'project_id': self.id,
-                'weight': weight,
-                'sequence': len(self.phase_ids) + 1,
+        today = fields.Date.context_today(self)
+        yesterday = today - timedelta(days=1)
+        params = self.env['ir.config_parameter'].sudo()
+        since = params.get_param(OVERDUE_SCAN_PARAM) or fields.Date.to_string(yesterday - timedelta(days=1))
+        self.flush_model(['name', 'state', 'project_manager_id'])
+        self.env['dt.project.milestone'].flush_model(['name', 'project_id', 'target_date', 'due_date', 'achieved',
+                                                      'state'])
+        self.env['dt.project.deliverable'].flush_model(['name', 'project_id', 'due_date', 'delivered', 'state'])
+        self.env.cr.execute("""
+            SELECT project.project_manager_id, project.id, project.name, item.kind, item.name, item.deadline
+              FROM (SELECT 'Milestone' AS kind, name, project_id, COALESCE(target_date, due_date) AS deadline
+                      FROM dt_project_milestone
+                     WHERE achieved IS NOT TRUE
+                       AND state IS DISTINCT FROM 'completed'
+                       AND COALESCE(target_date, due_date) < %(today)s
+                       AND COALESCE(target_date, due_date) > %(since)s
+                 UNION ALL
+                    SELECT 'Deliverable', name, project_id, due_date
+                      FROM dt_project_deliverable
+                     WHERE delivered IS NOT TRUE
+                       AND state IS DISTINCT FROM 'completed'
+                       AND due_date < %(today)s
+                       AND due_date > %(since)s) AS item
+              JOIN dt_project project ON project.id = item.project_id
+             WHERE project.state NOT IN ('completed', 'cancelled')
+               AND project.project_manager_id IS NOT NULL
+          ORDER BY project.project_manager_id, project.name, project.id, item.deadline
+        """, {'today': today, 'since': since})
+        digests = defaultdict(lambda: defaultdict(list))
+        for manager_id, project_id, project_name, kind, name, deadline in self.env.cr.fetchall():
+            digests[manager_id][project_id, project_name].append((kind, name, deadline))
+        self._send_overdue_digests(digests)
+        params.set_param(OVERDUE_SCAN_PARAM, fields.Date.to_string(yesterday))
+
+    @api.model
+    def _send_overdue_digests(self, digests):
+        """Create one mail per project manager from ``{manager_id: {(project_id, name): [items]}}``"""
+        managers = self.env['dt.consultant'].sudo().browse(list(digests))
+        mail_vals_list = []
+        for manager in managers:
+            email = manager.email or manager.user_id.email
+            projects = digests[manager.id]
+            if not email:
+                _logger.warning("Overdue digest of %s skipped: no email address", manager.name)
+                continue
+            sections = Markup('').join(
+                Markup('<h3>%s</h3><ul>%s%s</ul>') % (
+                    project_name,
+                    Markup('').join(
+                        Markup('<li>%s <b>%s</b>, due %s</li>') % (kind, name, fields.Date.to_string(deadline))
+                        for kind, name, deadline in items[:DIGEST_ITEM_LIMIT]
+                    ),
+                    Markup('<li>and %s more</li>') % (len(items) - DIGEST_ITEM_LIMIT)
+                    if len(items) > DIGEST_ITEM_LIMIT else '',
+                )
+                for (_project_id, project_name), items in projects.items()
+            )
+            item_count = sum(len(items) for items in projects.values())
+            mail_vals_list.append({
+                'subject': f"{item_count} overdue milestones and deliverables",
+                'email_from': self.env.company.email_formatted or self.env.user.email_formatted,
+                'email_to': email,
+                'body_html': Markup('<p>Hello %s,</p><p>The following items are now overdue:</p>%s') % (
+                    manager.name, sections),
+                'auto_delete': True,
             })
+        self.env['mail.mail'].sudo().create(mail_vals_list)
+        _logger.info("Queued %d overdue digests", len(mail_vals_list))
 
 
 class ProjectPhase(models.Model):
@@ -186,7 +381,14 @@ class ProjectPhase(models.Model):
     sequence = fields.Integer(string='Sequence', default=1)
     project_id = fields.Many2one('dt.project', string='Project', required=True, ondelete='cascade')
     weight = fields.Integer(string='Weight (%)', default=0)
-    progress = fields.Float(string='Progress %', default=0.0)
+    progress = fields.Float(
+        string='Progress %',
+        compute='_compute_progress',
+        store=True,
+        readonly=False,
+        default=0.0,
+        help="Share of done tasks; set manually on phases without tasks"
+    )
 
     state = fields.Selection([
         ('not_started', 'Not Started'),
@@ -196,10 +398,67 @@ class ProjectPhase(models.Model):
     ], string='Status', default='not_started')
 
     task_ids = fields.One2many('dt.project.task', 'phase_id', string='Tasks')
-    responsible_id = fields.Many2one('dt.consultant', string='Responsible')
+    responsible_id = fields.Many2one('dt.consultant', string='Responsible', index=True)
+    allocation_percentage = fields.Float(string='Responsible Allocation %', default=20.0,
+                                         help="Share of the responsible's week booked by the phase between "
+                                              "its start and end dates")
     start_date = fields.Date(string='Start Date')
     end_date = fields.Date(string='End Date')
 
+    def init(self):
+        # phase list of a project in display order, and the progress rollup
+        create_index(self.env.cr, 'dt_project_phase_project_sequence_idx', self._table,
+                     ['project_id', 'sequence'])
+
+    @api.depends('task_ids', 'task_ids.state')
+    @instrumented
+    def _compute_progress(self):
+        """Derive phase progress from task states with one grouped query for all stored phases.
+
+        New phases, and phases edited in a form, count their tasks from the
+        cache, so tasks edited inline are taken into account.
+        """
+        totals = defaultdict(lambda: [0, 0])
+        stored = self.filtered('id')
+        if stored:
+            for phase, state, count in self.env['dt.project.task']._read_group(
+                    [('phase_id', 'in', stored.ids)], ['phase_id', 'state'], ['__count']):
+                totals[phase.id][0] += count
+                if state == 'done':
+                    totals[phase.id][1] += count
+        for record in self - stored:
+            tasks = record.task_ids
+            totals[record.id] = [len(tasks), len(tasks.filtered(lambda task: task.state == 'done'))]
+        for record in self:
+            total, done = totals.get(record.id, (0, 0))
+            # phases without tasks keep their manually entered progress
+            if total:
+                record.progress = done / total * 100
+
+    # ------------------ CONSULTANT LOAD ------------------
+
+    def _booked_consultant_ids(self):
+        """Consultants booked through the phases: their responsibles and the assignees of their tasks"""
+        return set(self.responsible_id.ids) | set(self.task_ids.assigned_to.ids)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        phases = super().create(vals_list)
+        self.env['dt.consultant.load']._mark_dirty(phases.responsible_id.ids)
+        return phases
+
+    def write(self, vals):
+        if not LOAD_FIELDS['dt.project.phase'].intersection(vals):
+            return super().write(vals)
+        booked = self._booked_consultant_ids()
+        result = super().write(vals)
+        self.env['dt.consultant.load']._mark_dirty(booked | self._booked_consultant_ids())
+        return result
+
+    def unlink(self):
+        self.env['dt.consultant.load']._mark_dirty(self._booked_consultant_ids())
+        return super().unlink()
+
 
 class ProjectMilestone(models.Model):
     """Milestones in a project"""
@@ -210,7 +469,7 @@ class ProjectMilestone(models.Model):
     description = fields.Text(string='Description')
     due_date = fields.Date(string='Due Date')
     achieved = fields.Boolean(string='Achieved', default=False)
-    project_id = fields.Many2one('dt.project', string='Project', required=True, ondelete='cascade')
+    project_id = fields.Many2one('dt.project', string='Project', required=True, ondelete='cascade', index=True)
     target_date = fields.Date(string='Target Date')
     actual_date = fields.Date(string='Actual Date')
     importance = fields.Selection([('low','Low'), ('medium','Medium'), ('high','High')], string='Importance')
@@ -221,6 +480,12 @@ class ProjectMilestone(models.Model):
         ('blocked', 'Blocked')
     ], string='Status', default='not_started')
 
+    def init(self):
+        # overdue scan: range on the deadline of open milestones only
+        create_index(self.env.cr, 'dt_project_milestone_open_deadline_idx', self._table,
+                     ['(COALESCE(target_date, due_date))'],
+                     where="achieved IS NOT TRUE AND state IS DISTINCT FROM 'completed'")
+
 
 class ProjectDeliverable(models.Model):
     """Deliverables of a project"""
@@ -231,7 +496,7 @@ class ProjectDeliverable(models.Model):
     description = fields.Text(string='Description')
     due_date = fields.Date(string='Due Date')
     delivered = fields.Boolean(string='Delivered', default=False)
-    project_id = fields.Many2one('dt.project', string='Project', required=True, ondelete='cascade')
+    project_id = fields.Many2one('dt.project', string='Project', required=True, ondelete='cascade', index=True)
     responsible_id = fields.Many2one('dt.consultant', string='Responsible')
     delivery_date = fields.Date(string='Delivery Date')
     document_url = fields.Char(string='Document URL')
@@ -242,6 +507,11 @@ class ProjectDeliverable(models.Model):
         ('blocked', 'Blocked')
     ], string='Status', default='not_started')
 
+    def init(self):
+        # overdue scan: range on the due date of open deliverables only
+        create_index(self.env.cr, 'dt_project_deliverable_open_due_idx', self._table, ['due_date'],
+                     where="delivered IS NOT TRUE AND state IS DISTINCT FROM 'completed'")
+
 
 class ProjectTask(models.Model):
     """Tasks within a project phase"""
@@ -250,7 +520,9 @@ class ProjectTask(models.Model):
 
     name = fields.Char(string='Task', required=True)
     description = fields.Text(string='Description')
-    assigned_to = fields.Many2one('dt.consultant', string='Assigned Consultant')
+    assigned_to = fields.Many2one('dt.consultant', string='Assigned Consultant', index=True)
+    allocation_percentage = fields.Float(string='Allocation %', default=10.0,
+                                         help="Share of the assignee's week booked over the dates of the phase")
     phase_id = fields.Many2one('dt.project.phase', string='Phase', required=True, ondelete='cascade')
 
     state = fields.Selection([
@@ -259,3 +531,25 @@ class ProjectTask(models.Model):
         ('done', 'Done'),
         ('blocked', 'Blocked')
     ], string='Status', default='todo')
+
+    def init(self):
+        # task list of a phase and the task state rollup into phase progress
+        create_index(self.env.cr, 'dt_project_task_phase_state_idx', self._table, ['phase_id', 'state'])
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        tasks = super().create(vals_list)
+        self.env['dt.consultant.load']._mark_dirty(tasks.assigned_to.ids)
+        return tasks
+
+    def write(self, vals):
+        if not LOAD_FIELDS['dt.project.task'].intersection(vals):
+            return super().write(vals)
+        booked = set(self.assigned_to.ids)
+        result = super().write(vals)
+        self.env['dt.consultant.load']._mark_dirty(booked | set(self.assigned_to.ids))
+        return result
+
+    def unlink(self):
+        self.env['dt.consultant.load']._mark_dirty(self.assigned_to.ids)
+        return super().unlink()
@@ -0,0 +1,5 @@
+from . import test_assessment_aggregates
+from . import test_assessment_import
+from . import test_notification_digest
+from . import test_query_plans
+from . import test_submit_answers
@@ -0,0 +1,52 @@
+from odoo.tests import TransactionCase, tagged
+
+CATEGORIES = ('technology', 'process', 'people', 'culture')
+AGGREGATE_FIELDS = [f'{category}_{aggregate}' for category in CATEGORIES
+                    for aggregate in ('score_sum', 'line_count')] + ['answered_line_count']
+
+
+@tagged('post_install', '-at_install')
+class TestAssessmentAggregates(TransactionCase):
+    """The line deltas keep the stored aggregates equal to a rebuild from the lines"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        partner = cls.env['res.partner'].create({'name': 'Aggregate Client'})
+        client = cls.env['dt.client.company'].create({
+            'name': 'Aggregate Client',
+            'partner_id': partner.id,
+            'industry_type': 'manufacturing',
+            'company_size': 'large',
+        })
+        consultant = cls.env['dt.consultant'].create({'name': 'Aggregate Consultant'})
+        cls.assessments = cls.env['dt.assessment'].create([{
+            'name': name,
+            'client_id': client.id,
+            'consultant_id': consultant.id,
+        } for name in ('Aggregates A', 'Aggregates B')])
+        cls.assessments.action_start_assessment()
+
+    def assertAggregatesRebuilt(self):
+        maintained = self.assessments.read(AGGREGATE_FIELDS)
+        self.assessments._rebuild_line_aggregates()
+        self.assertEqual(self.assessments.read(AGGREGATE_FIELDS), maintained)
+
+    def test_create(self):
+        self.assertTrue(self.assessments[0].technology_line_count)
+        self.assertAggregatesRebuilt()
+
+    def test_write(self):
+        lines = self.assessments[0].assessment_line_ids
+        lines[:3].write({'answer': '4'})
+        lines[0].write({'answer': '2', 'weight': 2.5})
+        lines[1].write({'answer': False})
+        lines[2].write({'category': 'culture' if lines[2].category != 'culture' else 'people'})
+        lines[3].write({'assessment_id': self.assessments[1].id, 'answer': '5'})
+        self.assertAggregatesRebuilt()
+
+    def test_unlink(self):
+        lines = self.assessments[0].assessment_line_ids
+        lines[:2].write({'answer': '3'})
+        (lines[1:3] | self.assessments[1].assessment_line_ids[:1]).unlink()
+        self.assertAggregatesRebuilt()
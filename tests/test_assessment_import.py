@@ -0,0 +1,66 @@
+import json
+import os
+import tempfile
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestAssessmentImport(TransactionCase):
+    """An interrupted import resumes from its checkpoint without duplicating assessments"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        partner = cls.env['res.partner'].create({'name': 'Imported Client'})
+        cls.client = cls.env['dt.client.company'].create({
+            'name': 'Imported Client',
+            'partner_id': partner.id,
+            'industry_type': 'logistics',
+            'company_size': 'small',
+        })
+        cls.consultant = cls.env['dt.consultant'].create({'name': 'Imported Consultant'})
+        cls.templates = cls.env['dt.assessment.template'].search([('active', '=', True)], limit=3)
+
+    def _write_source(self, rows):
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False, encoding='utf-8') as source:
+            source.writelines(json.dumps(row) + '\n' for row in rows)
+        self.addCleanup(os.unlink, source.name)
+        return source.name
+
+    def _row(self, ref, template, answer):
+        # JSON Lines keep numeric references as numbers
+        return {
+            'assessment_ref': ref,
+            'client_id': self.client.id,
+            'consultant_id': self.consultant.id,
+            'assessment_date': '2024-03-15',
+            'question_id': template.id,
+            'answer': answer,
+        }
+
+    def test_resume_in_the_middle_of_an_assessment(self):
+        rows = [self._row(1001, template, '4') for template in self.templates] + [
+            self._row(1002, self.templates[0], '2'),
+        ]
+        job = self.env['dt.assessment.import.job'].create({
+            'name': 'Resumed import',
+            'file_path': self._write_source(rows),
+            'file_format': 'jsonl',
+            'chunk_size': 2,
+        })
+        # the first chunk was committed before the job was interrupted
+        created = job._import_chunk(rows[:2], first_row=1)
+        job.write({'rows_done': 2, 'assessments_created': created})
+
+        job._run()
+
+        self.assertEqual(job.state, 'done')
+        self.assertEqual(job.rows_done, len(rows))
+        self.assertEqual(job.assessments_created, 2)
+        first = self.env['dt.assessment'].search([('import_ref', '=', '1001')])
+        self.assertEqual(len(first), 1)
+        self.assertEqual(len(first.assessment_line_ids), len(self.templates))
+        self.assertEqual(first.answered_line_count, len(self.templates))
+        second = self.env['dt.assessment'].search([('import_ref', '=', '1002')])
+        self.assertEqual(len(second.assessment_line_ids), 1)
@@ -0,0 +1,68 @@
+from odoo.tests import TransactionCase, tagged
+
+EVENT_COLUMNS = "id, res_model, res_id, field_name, old_value, new_value, event_date, partner_id"
+
+
+@tagged('post_install', '-at_install')
+class TestNotificationDigest(TransactionCase):
+    """Digests are prepared offline from the queued events, one mail per recipient"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env['dt.notification.event'].search([]).unlink()
+        cls.alice, cls.bob = cls.env['res.partner'].create([
+            {'name': 'Alice Digest', 'email': 'alice@example.com'},
+            {'name': 'Bob Digest', 'email': 'bob@example.com'},
+        ])
+        cls.client = cls.env['dt.client.company'].with_context(mail_create_nosubscribe=True).create({
+            'name': 'Digest Client',
+            'partner_id': cls.alice.id,
+            'industry_type': 'retail',
+            'company_size': 'small',
+        })
+        cls.client.message_unsubscribe(cls.client.message_partner_ids.ids)
+        cls.client.message_subscribe((cls.alice | cls.bob).ids)
+
+    def _queued_events(self):
+        self.env.flush_all()
+        self.env.cr.execute(f"SELECT {EVENT_COLUMNS} FROM dt_notification_event ORDER BY id")
+        return self.env.cr.fetchall()
+
+    def test_one_mail_per_partner_with_coalesced_values(self):
+        for status in ('assessment', 'proposal', 'active'):
+            self.client.write({'status': status})
+        events = self._queued_events()
+        self.assertEqual(len(events), 3)
+
+        mails = self.env['dt.notification.event']._prepare_digests(events)
+
+        self.assertEqual(len(mails), 2)
+        self.assertEqual(mails.recipient_ids, self.alice | self.bob)
+        for mail in mails:
+            self.assertEqual(len(mail.recipient_ids), 1)
+            self.assertIn('Prospect', mail.body_html)
+            self.assertIn('Active Client', mail.body_html)
+            self.assertNotIn('Proposal Stage', mail.body_html)
+
+    def test_reverted_change_is_not_mailed(self):
+        self.client.write({'status': 'assessment'})
+        self.client.write({'status': 'prospect'})
+
+        mails = self.env['dt.notification.event']._prepare_digests(self._queued_events())
+
+        self.assertFalse(mails)
+
+    def test_requeued_event_only_goes_to_its_partner(self):
+        self.env['dt.notification.event'].create({
+            'res_model': self.client._name,
+            'res_id': self.client.id,
+            'field_name': 'status',
+            'old_value': 'prospect',
+            'new_value': 'active',
+            'partner_id': self.bob.id,
+        })
+
+        mails = self.env['dt.notification.event']._prepare_digests(self._queued_events())
+
+        self.assertEqual(mails.recipient_ids, self.bob)
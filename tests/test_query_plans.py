@@ -0,0 +1,62 @@
+from odoo.tests import TransactionCase, tagged
+
+# tables of the hot queries, analyzed once the dataset is seeded
+ANALYZED_TABLES = (
+    'dt_client_company', 'dt_consultant', 'dt_assessment', 'dt_assessment_line', 'dt_project',
+    'dt_project_phase', 'dt_project_task', 'dt_project_milestone', 'dt_project_deliverable',
+    'dt_project_team_rel', 'dt_consultant_load',
+)
+
+# index each hot query must be able to use
+EXPECTED_INDEXES = {
+    'latest_assessment_per_client': 'dt_assessment_client_date_idx',
+    'latest_project_per_client': 'dt_project_client_start_idx',
+    'assessment_list': 'dt_assessment__assessment_date_index',
+    'assessments_by_state': 'dt_assessment__state_index',
+    'assessment_questionnaire': 'dt_assessment_line_assessment_category_idx',
+    'assessment_category_lines': 'dt_assessment_line_assessment_category_idx',
+    'projects_by_manager': 'dt_project__project_manager_id_index',
+    'project_list': 'dt_project_create_date_idx',
+    'phase_rollup': 'dt_project_phase_project_sequence_idx',
+    'task_rollup': 'dt_project_task_phase_state_idx',
+    'consultant_load_window': 'dt_consultant_load_consultant_week_unique',
+    'overdue_milestones': 'dt_project_milestone_open_deadline_idx',
+    'overdue_deliverables': 'dt_project_deliverable_open_due_idx',
+    'team_membership': 'dt_project_team_rel_consultant_id_project_id_idx',
+}
+
+
+@tagged('post_install', '-at_install')
+class TestHotQueryPlans(TransactionCase):
+    """Every hot query can be answered from its index on seeded, analyzed data.
+
+    Sequential scans are disabled, as in ``check_hot_query_plans``: on tables
+    of a few thousand rows the planner may legitimately prefer them, which
+    would make the result depend on the planner version and costs.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env['dt.benchmark']._generate_dataset(
+            clients=400, assessments_per_client=3, projects_per_client=2, phases_per_project=6,
+            tasks_per_phase=3, milestones_per_project=4, deliverables_per_project=4, consultants=200, seed=11)
+        cr = cls.env.cr
+        # a realistic state mix: most assessments are completed and most milestones achieved
+        cr.execute("UPDATE dt_assessment SET state = 'completed' WHERE id % 10 != 0")
+        cr.execute("UPDATE dt_project_milestone SET achieved = TRUE, state = 'completed' WHERE id % 5 != 0")
+        cr.execute("UPDATE dt_project_deliverable SET delivered = TRUE, state = 'completed' WHERE id % 5 != 0")
+        cls.env.invalidate_all()
+        for table in ANALYZED_TABLES:
+            cr.execute(f"ANALYZE {table}")
+
+    def test_every_hot_query_is_covered(self):
+        self.assertEqual(set(EXPECTED_INDEXES), set(self.env['dt.query.plan'].HOT_QUERIES))
+
+    def test_hot_queries_use_their_index(self):
+        QueryPlan = self.env['dt.query.plan']
+        self.env.cr.execute("SET LOCAL enable_seqscan = off")
+        for name, plan in QueryPlan._explain_hot_queries().items():
+            with self.subTest(query=name):
+                self.assertFalse(QueryPlan._seq_scans(plan), f"{name} falls back to a sequential scan")
+                self.assertIn(EXPECTED_INDEXES[name], QueryPlan._index_names(plan))
@@ -0,0 +1,60 @@
+from odoo.exceptions import ValidationError
+from odoo.tests import TransactionCase, tagged
+
+CATEGORIES = ('technology', 'process', 'people', 'culture')
+
+
+@tagged('post_install', '-at_install')
+class TestSubmitAnswers(TransactionCase):
+    """The batch answering API validates the whole vector and scores like per-line writes"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        partner = cls.env['res.partner'].create({'name': 'Answering Client'})
+        cls.client = cls.env['dt.client.company'].create({
+            'name': 'Answering Client',
+            'partner_id': partner.id,
+            'industry_type': 'finance',
+            'company_size': 'medium',
+        })
+        cls.consultant = cls.env['dt.consultant'].create({'name': 'Answering Consultant'})
+        cls.assessment, cls.other = cls.env['dt.assessment'].create([{
+            'name': name,
+            'client_id': cls.client.id,
+            'consultant_id': cls.consultant.id,
+        } for name in ('Batch Answers', 'Line Answers')])
+        (cls.assessment | cls.other).action_start_assessment()
+
+    def _answers(self, assessment):
+        """Answer vector cycling through the scale, in question order"""
+        return {line.id: str(index % 5 + 1) for index, line in enumerate(assessment.assessment_line_ids.sorted('id'))}
+
+    def test_rejects_foreign_line_ids(self):
+        foreign_line = self.other.assessment_line_ids[0]
+        with self.assertRaises(ValidationError):
+            self.assessment.submit_answers({foreign_line.id: '3'})
+
+    def test_rejects_invalid_answers(self):
+        line = self.assessment.assessment_line_ids[0]
+        with self.assertRaises(ValidationError):
+            self.assessment.submit_answers({line.id: '7'})
+
+    def test_rejects_non_numeric_line_ids(self):
+        with self.assertRaises(ValidationError):
+            self.assessment.submit_answers({'first': '3'})
+
+    def test_same_scores_as_line_writes(self):
+        result = self.assessment.submit_answers(self._answers(self.assessment))
+        for line, answer in zip(self.other.assessment_line_ids.sorted('id'), self._answers(self.other).values()):
+            line.write({'answer': answer})
+
+        self.assertEqual(result['updated'], len(self.assessment.assessment_line_ids))
+        self.assertEqual(self.assessment.progress, 100)
+        self.assertAlmostEqual(self.assessment.total_score, self.other.total_score)
+        for category in CATEGORIES:
+            self.assertAlmostEqual(self.assessment[f'{category}_score'], self.other[f'{category}_score'])
+        self.assertEqual(
+            self.assessment.assessment_line_ids.sorted('id').mapped('score'),
+            self.other.assessment_line_ids.sorted('id').mapped('score'),
+        )